@@ -8,15 +8,22 @@ Includes:
 - Structured logging
 - API versioning
 """
+import asyncio
+import time
+
+import structlog
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from backend.config.settings import settings
 from backend.observability.logging_config import configure_logging
-from backend.database.connection import init_db
+from backend.database.connection import init_db, warm_pool
 from backend.api.middleware.logging import LoggingMiddleware
+from backend.observability.audit_writer import audit_writer
+from backend.observability.metrics import request_count_for, request_latency_for
 from backend.api.middleware.error_handler import (
     http_exception_handler,
     validation_exception_handler,
@@ -27,6 +34,21 @@ from backend.api.routers import health, auth, query, admin, schema
 # Configure logging
 configure_logging()
 
+logger = structlog.get_logger(component="lifecycle")
+
+# High-frequency probe/scrape endpoints that are neither logged nor counted
+UNINSTRUMENTED_PATHS = frozenset({
+    "/metrics",
+    "/metrics/",
+    f"/api/{settings.API_VERSION}/health/liveness",
+})
+
+
+def _route_template(request) -> str:
+    """Matched route path (e.g. ``/api/v1/admin/users/{user_id}``) for metric labels."""
+    route = request.scope.get("route")
+    return route.path if route is not None else "unmatched"
+
 
 def create_app() -> FastAPI:
     """
@@ -41,20 +63,28 @@ def create_app() -> FastAPI:
         version="1.0.0",
         docs_url="/docs" if not settings.is_production else None,  # Disable in production
         redoc_url="/redoc" if not settings.is_production else None,
-        openapi_url=f"/api/{settings.API_VERSION}/openapi.json"
+        openapi_url=f"/api/{settings.API_VERSION}/openapi.json" if not settings.is_production else None,
+        default_response_class=ORJSONResponse
     )
     
-    # CORS Middleware (configure appropriately for production)
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=["*"] if settings.is_development else [],  # Restrict in production
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
+    # CORS Middleware: any origin in development, explicit allowlist elsewhere.
+    # Skipped entirely when no origins are allowed.
+    cors_origins = ["*"] if settings.is_development else list(settings.CORS_ORIGINS)
+    if cors_origins:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=cors_origins,
+            allow_credentials=True,
+            allow_methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
+            allow_headers=["Authorization", "Content-Type"],
+        )
     
     # Custom middleware
-    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(
+        LoggingMiddleware,
+        log_request_start=settings.LOG_REQUEST_START,
+        skip_paths=UNINSTRUMENTED_PATHS
+    )
     
     # Exception handlers
     app.add_exception_handler(StarletteHTTPException, http_exception_handler)
@@ -77,22 +107,22 @@ def create_app() -> FastAPI:
     # Metrics Middleware
     @app.middleware("http")
     async def metrics_middleware(request, call_next):
-        import time
-        from backend.observability.metrics import REQUEST_LATENCY, REQUEST_COUNT
+        if request.url.path in UNINSTRUMENTED_PATHS:
+            return await call_next(request)
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         method = request.method
-        path = request.url.path
         
         try:
             response = await call_next(request)
-            status_code = response.status_code
-            REQUEST_COUNT.labels(method=method, endpoint=path, status=status_code).inc()
-            REQUEST_LATENCY.labels(method=method, endpoint=path).observe(time.time() - start_time)
-            return response
         except Exception as e:
-            REQUEST_COUNT.labels(method=method, endpoint=path, status=500).inc()
+            request_count_for(method, _route_template(request), 500).inc()
             raise e
+        
+        endpoint = _route_template(request)
+        request_count_for(method, endpoint, response.status_code).inc()
+        request_latency_for(method, endpoint).observe(time.perf_counter() - start_time)
+        return response
 
     return app
 
@@ -108,9 +138,6 @@ async def startup_event():
     
     Initializes database and performs other startup tasks.
     """
-    import structlog
-    logger = structlog.get_logger()
-    
     logger.info(
         "application_starting",
         version="1.0.0",
@@ -127,14 +154,29 @@ async def startup_event():
         logger.error("database_initialization_failed", error=str(e))
         raise
     
+    # Warm the connection pool before traffic arrives
+    try:
+        warmed = warm_pool(settings.DB_POOL_SIZE)
+        logger.info("connection_pool_warmed", connections=warmed)
+    except Exception as e:
+        logger.warning("connection_pool_warmup_failed", error=str(e))
+    
+    # Build the OpenAPI schema off the event loop so the first /docs hit doesn't stall
+    if app.openapi_url:
+        app.openapi_schema = await asyncio.to_thread(app.openapi)
+    
+    # Start batched audit log writer
+    audit_writer.start()
+    
     # Initialize default roles
     try:
         from backend.auth.rbac import RBACService
-        from backend.database.connection import SessionLocal
+        from backend.database.connection import ScopedSession
         
-        db = SessionLocal()
-        RBACService.initialize_default_roles(db)
-        db.close()
+        try:
+            RBACService.initialize_default_roles(ScopedSession())
+        finally:
+            ScopedSession.remove()
         
         logger.info("default_roles_initialized")
     except Exception as e:
@@ -146,10 +188,10 @@ async def shutdown_event():
     """
     Application shutdown event handler.
     """
-    import structlog
-    logger = structlog.get_logger()
-    
     logger.info("application_shutting_down")
+    
+    # Flush queued audit log entries
+    await audit_writer.stop()
 
 
 # For direct execution
@@ -160,5 +202,8 @@ if __name__ == "__main__":
         "backend.api.main:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
     )
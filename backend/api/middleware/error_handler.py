@@ -4,17 +4,17 @@ Global error handling middleware.
 Provides consistent error responses and logging for all exceptions.
 """
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import structlog
 
 from backend.api.schemas.common import ErrorResponse, ErrorDetail
 
-logger = structlog.get_logger()
+logger = structlog.get_logger(component="api")
 
 
-async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> ORJSONResponse:
     """
     Handle HTTP exceptions with standardized response.
     """
@@ -34,13 +34,13 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException)
         request_id=request_id
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
-        content=error_response.model_dump(mode='json')
+        content=error_response.model_dump()
     )
 
 
-async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+async def validation_exception_handler(request: Request, exc: RequestValidationError) -> ORJSONResponse:
     """
     Handle request validation errors with detailed feedback.
     """
@@ -70,13 +70,13 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         request_id=request_id
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content=error_response.model_dump(mode='json')
+        content=error_response.model_dump()
     )
 
 
-async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def generic_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
     """
     Handle unexpected exceptions.
     """
@@ -97,7 +97,7 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
         request_id=request_id
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content=error_response.model_dump(mode='json')
+        content=error_response.model_dump(mode="json")
     )
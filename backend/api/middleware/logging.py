@@ -8,30 +8,58 @@ Logs all HTTP requests and responses with:
 - Status code
 - Response time
 """
+import logging
 import time
-import uuid
-from typing import Callable
+from typing import Callable, Iterable
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp
 from starlette.requests import Request
 from starlette.responses import Response
 import structlog
 
-logger = structlog.get_logger()
+from backend.observability.logging_config import get_log_level
+from backend.observability.tracing import new_request_id
+
+logger = structlog.get_logger(component="api")
 
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     """
     Middleware for structured logging of requests and responses.
+    
+    Only the completion line is logged by default; pass
+    ``log_request_start=True`` to also log when a request arrives.
+    Requests to ``skip_paths`` (metrics scrapes, liveness probes) are
+    passed through untouched.
     """
     
+    def __init__(
+        self,
+        app: ASGIApp,
+        log_request_start: bool = False,
+        skip_paths: Iterable[str] = ()
+    ):
+        super().__init__(app)
+        self.log_request_start = log_request_start
+        self.skip_paths = frozenset(skip_paths)
+        # Resolved once: when INFO is filtered out there is nothing to enrich
+        self._info_enabled = get_log_level() <= logging.INFO
+    
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """
         Process request and log details.
         """
-        # Generate request ID
-        request_id = str(uuid.uuid4())
+        if request.url.path in self.skip_paths:
+            return await call_next(request)
+        
+        request_id = new_request_id()
         request.state.request_id = request_id
         
+        if not self._info_enabled:
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = request_id
+            return response
+        
         # Start timer
         start_time = time.time()
         
@@ -45,29 +73,32 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         except:
             pass
         
-        # Log request
-        logger.info(
-            "http_request_start",
+        # Bind per-request context once so each log call only adds its own fields
+        request_logger = logger.bind(
             request_id=request_id,
             method=request.method,
-            path=request.url.path,
-            query_params=str(request.query_params),
-            client_host=request.client.host if request.client else None,
-            user_agent=request.headers.get("user-agent"),
-            user=user_info
+            path=request.url.path
         )
         
+        # Log request
+        if self.log_request_start:
+            client = request.client
+            request_logger.info(
+                "http_request_start",
+                query_params=str(request.query_params),
+                client_host=client.host if client else None,
+                user_agent=request.headers.get("user-agent"),
+                user=user_info
+            )
+        
         # Process request
         try:
             response = await call_next(request)
         except Exception as e:
             # Log exception
             processing_time = time.time() - start_time
-            logger.error(
+            request_logger.error(
                 "http_request_error",
-                request_id=request_id,
-                method=request.method,
-                path=request.url.path,
                 error=str(e),
                 processing_time_ms=processing_time * 1000
             )
@@ -77,11 +108,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         processing_time = time.time() - start_time
         
         # Log response
-        logger.info(
+        request_logger.info(
             "http_request_complete",
-            request_id=request_id,
-            method=request.method,
-            path=request.url.path,
             status_code=response.status_code,
             processing_time_ms=processing_time * 1000,
             user=user_info
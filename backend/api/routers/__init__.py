@@ -2,4 +2,8 @@
 API routers package.
 
 Contains modular route handlers for different resource groups.
+
+Handlers that use the synchronous SQLAlchemy session are declared with plain
+``def`` so Starlette dispatches them to its threadpool; ``async def`` is
+reserved for handlers that do not block.
 """
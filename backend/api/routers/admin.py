@@ -4,24 +4,33 @@ Admin router for user management and system administration.
 Admin-only endpoints for:
 - User CRUD operations
 - Role assignment
+- API key issuance
 - System configuration
+- Audit log export
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Iterator, List, Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
 
 from backend.api.schemas.common import SuccessResponse, PaginationParams
 from backend.auth.dependencies import get_current_admin_user
-from backend.auth.models import User, UserCreate, UserResponse, UserUpdate, RoleEnum
+from backend.auth.models import (
+    APIKey, APIKeyCreate, APIKeyToken, User, Role, UserCreate, UserResponse, UserUpdate, RoleEnum
+)
 from backend.auth.service import AuthService
 from backend.auth.rbac import RBACService
-from backend.database.connection import get_db
+from backend.database.connection import get_db, SessionLocal
+from backend.database.models import AuditLog
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(
+def create_user(
     user_data: UserCreate,
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -32,15 +41,16 @@ async def create_user(
     Requires: ADMIN role
     """
     # Check if user already exists
-    existing_user = AuthService.get_user_by_email(db, user_data.email)
-    if existing_user:
+    email_taken, username_taken = AuthService.get_user_by_email_or_username(
+        db, user_data.email, user_data.username
+    )
+    if email_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists"
         )
     
-    existing_user = AuthService.get_user_by_username(db, user_data.username)
-    if existing_user:
+    if username_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this username already exists"
@@ -56,20 +66,11 @@ async def create_user(
         roles=user_data.roles
     )
     
-    return UserResponse(
-        id=user.id,
-        email=user.email,
-        username=user.username,
-        full_name=user.full_name,
-        is_active=user.is_active,
-        is_superuser=user.is_superuser,
-        roles=[role.name for role in user.roles],
-        created_at=user.created_at
-    )
+    return UserResponse.model_validate(user)
 
 
 @router.get("/users", response_model=List[UserResponse])
-async def list_users(
+def list_users(
     pagination: PaginationParams = Depends(),
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -79,25 +80,19 @@ async def list_users(
     
     Requires: ADMIN role
     """
-    users = db.query(User).offset(pagination.offset).limit(pagination.page_size).all()
-    
-    return [
-        UserResponse(
-            id=user.id,
-            email=user.email,
-            username=user.username,
-            full_name=user.full_name,
-            is_active=user.is_active,
-            is_superuser=user.is_superuser,
-            roles=[role.name for role in user.roles],
-            created_at=user.created_at
-        )
-        for user in users
-    ]
+    users = (
+        db.query(User)
+        .options(joinedload(User.roles))
+        .offset(pagination.offset)
+        .limit(pagination.page_size)
+        .all()
+    )
+    
+    return [UserResponse.model_validate(user) for user in users]
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-async def get_user(
+def get_user(
     user_id: int,
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -114,20 +109,11 @@ async def get_user(
             detail="User not found"
         )
     
-    return UserResponse(
-        id=user.id,
-        email=user.email,
-        username=user.username,
-        full_name=user.full_name,
-        is_active=user.is_active,
-        is_superuser=user.is_superuser,
-        roles=[role.name for role in user.roles],
-        created_at=user.created_at
-    )
+    return UserResponse.model_validate(user)
 
 
 @router.patch("/users/{user_id}", response_model=UserResponse)
-async def update_user(
+def update_user(
     user_id: int,
     user_update: UserUpdate,
     current_admin: User = Depends(get_current_admin_user),
@@ -145,39 +131,25 @@ async def update_user(
             detail="User not found"
         )
     
-    # Update fields
-    if user_update.email is not None:
-        user.email = user_update.email
-    if user_update.full_name is not None:
-        user.full_name = user_update.full_name
-    if user_update.is_active is not None:
-        user.is_active = user_update.is_active
+    # Update provided fields with a single UPDATE statement
+    update_values = user_update.model_dump(exclude_none=True, exclude={"roles"})
+    if update_values:
+        db.query(User).filter(User.id == user_id).update(update_values)
+    
     if user_update.roles is not None:
-        # Update roles
-        user.roles.clear()
-        for role_name in user_update.roles:
-            from backend.auth.models import Role
-            role = db.query(Role).filter(Role.name == role_name.value).first()
-            if role:
-                user.roles.append(role)
+        # Update roles (one lookup for all requested names)
+        role_names = [role_name.value for role_name in user_update.roles]
+        user.roles = db.query(Role).filter(Role.name.in_(role_names)).all()
     
+    # Build the response before commit expires the instance
+    response = UserResponse.model_validate(user)
     db.commit()
-    db.refresh(user)
-    
-    return UserResponse(
-        id=user.id,
-        email=user.email,
-        username=user.username,
-        full_name=user.full_name,
-        is_active=user.is_active,
-        is_superuser=user.is_superuser,
-        roles=[role.name for role in user.roles],
-        created_at=user.created_at
-    )
+    
+    return response
 
 
 @router.delete("/users/{user_id}", response_model=SuccessResponse)
-async def delete_user(
+def delete_user(
     user_id: int,
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -204,8 +176,66 @@ async def delete_user(
     )
 
 
+@router.post("/users/{user_id}/api-keys", response_model=APIKeyToken, status_code=status.HTTP_201_CREATED)
+def create_api_key(
+    user_id: int,
+    key_data: APIKeyCreate,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Issue an API key for service-to-service access as this user.
+    
+    The plain key is returned only in this response; store it securely.
+    
+    Requires: ADMIN role
+    """
+    user = AuthService.get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    api_key, record = AuthService.create_api_key(db, user, key_data.name)
+    
+    return APIKeyToken(
+        id=record.id,
+        name=record.name,
+        api_key=api_key,
+        created_at=record.created_at
+    )
+
+
+@router.delete("/api-keys/{key_id}", response_model=SuccessResponse)
+def revoke_api_key(
+    key_id: int,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Revoke an API key.
+    
+    Requires: ADMIN role
+    """
+    record = db.get(APIKey, key_id)
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found"
+        )
+    
+    record.is_active = False
+    db.commit()
+    
+    return SuccessResponse(
+        success=True,
+        message=f"API key {key_id} revoked successfully"
+    )
+
+
 @router.post("/init-roles", response_model=SuccessResponse)
-async def initialize_roles(
+def initialize_roles(
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
@@ -220,3 +250,42 @@ async def initialize_roles(
         success=True,
         message="Default roles initialized successfully"
     )
+
+
+def _stream_audit_logs(user_id: Optional[int], since: Optional[datetime]) -> Iterator[bytes]:
+    # Owns its session: the response body is produced after the request's
+    # dependencies (and their get_db session) may already have been closed
+    db = SessionLocal()
+    try:
+        stmt = select(AuditLog.__table__).order_by(AuditLog.id)
+        if user_id is not None:
+            stmt = stmt.where(AuditLog.user_id == user_id)
+        if since is not None:
+            stmt = stmt.where(AuditLog.timestamp >= since)
+        
+        # Server-side cursor, fetched 1000 rows at a time
+        result = db.execute(stmt.execution_options(yield_per=1000))
+        for row in result.mappings():
+            yield orjson.dumps(dict(row)) + b"\n"
+    finally:
+        db.close()
+
+
+@router.get("/audit-logs/export")
+def export_audit_logs(
+    user_id: Optional[int] = Query(None, description="Only this user's entries"),
+    since: Optional[datetime] = Query(None, description="Only entries at or after this time"),
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    Export audit log entries as newline-delimited JSON.
+    
+    Rows are streamed from the database in chunks, so memory use does not
+    grow with the size of the export.
+    
+    Requires: ADMIN role
+    """
+    return StreamingResponse(
+        _stream_audit_logs(user_id, since),
+        media_type="application/x-ndjson"
+    )
@@ -22,9 +22,10 @@ async def login(
     """
     Authenticate user and return JWT token.
     
-    Uses OAuth2 password flow (username/password).
+    Uses OAuth2 password flow (username/password). Password verification
+    runs on a dedicated pool rather than the shared request threadpool.
     """
-    user = AuthService.authenticate_user(db, form_data.username, form_data.password)
+    user = await AuthService.aauthenticate_user(db, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -51,7 +52,7 @@ async def login(
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(
+def refresh_token(
     current_user = Depends(AuthService.decode_access_token),
     db: Session = Depends(get_db)
 ):
@@ -18,7 +18,7 @@ router = APIRouter(prefix="/health", tags=["Health"])
 
 
 @router.get("/", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_db)):
     """
     Health check endpoint for load balancers and orchestrators.
     
@@ -52,7 +52,7 @@ async def liveness():
 
 
 @router.get("/readiness")
-async def readiness(db: Session = Depends(get_db)):
+def readiness(db: Session = Depends(get_db)):
     """
     Kubernetes readiness probe.
     
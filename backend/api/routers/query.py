@@ -4,13 +4,21 @@ Query router for natural language to SQL functionality.
 Handles:
 - Natural language query processing
 - SQL generation and validation
-- Query execution
+- Query execution (buffered or streamed as NDJSON)
 - Query history
 - Caching and Observability
 """
+import asyncio
+import base64
 import time
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 
 from backend.api.schemas.query import (
@@ -26,36 +34,122 @@ from backend.auth.models import User, PermissionType
 from backend.auth.rbac import RBACService
 from backend.database.connection import get_db
 from backend.database.models import AuditLog
-from backend.llm.client import get_llm_client
+from backend.llm.client import LLMClient, get_llm_client, strip_sql_fences
 from backend.llm.prompts import get_text_to_sql_prompt
 from backend.llm.cache import llm_cache
 from backend.safety.validator import SQLValidator
-from backend.database.executor import execute_sql_query, QueryExecutionError
+from backend.safety.question_filter import reject_question, match_template
+from backend.database.executor import (
+    execute_sql_query,
+    execute_sql_query_columnar,
+    execute_sql_query_stream,
+    QueryExecutionError,
+)
+from backend.observability.audit_writer import audit_writer
 from backend.config.settings import settings
 from backend.observability.metrics import (
-    LLM_REQUEST_COUNT, 
+    llm_request_count_for,
+    llm_latency_for,
     SQL_QUERY_COUNT, 
-    LLM_LATENCY,
     SQL_EXECUTION_TIME
 )
 
 router = APIRouter(prefix="/query", tags=["Query"])
 
+# Caps concurrent provider calls so a burst of queries can't exhaust
+# rate limits or connections
+_llm_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+
+
+# In-flight generations by (provider, question), shared by concurrent
+# identical requests so each unique question costs one LLM call at a time
+_inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+
+async def _call_llm(llm_client: LLMClient, question: str, history: Optional[List[Dict[str, str]]]) -> str:
+    llm_start = time.time()
+    try:
+        prompt = get_text_to_sql_prompt(question)
+        async with _llm_semaphore:
+            generated_sql = await llm_client.agenerate_sql(prompt, history=history)
+        
+        # Clean SQL
+        generated_sql = strip_sql_fences(generated_sql)
+        
+        # Cache result; answers that depend on the conversation are kept
+        # out of the semantic index so paraphrases never pick them up
+        await run_in_threadpool(
+            llm_cache.set, question, settings.LLM_PROVIDER, generated_sql, semantic=not history
+        )
+        
+        # Metrics
+        llm_request_count_for(settings.LLM_PROVIDER, "default").inc()
+        llm_latency_for(settings.LLM_PROVIDER, "default").observe(time.time() - llm_start)
+        return generated_sql
+        
+    except Exception as e:
+        llm_request_count_for(settings.LLM_PROVIDER, "default").inc() # Count errors too?
+        raise e
+
+
+async def _generate_sql(llm_client: LLMClient, question: str, history: Optional[List[Dict[str, str]]]) -> str:
+    """Generate SQL, joining an identical in-flight generation if there is one."""
+    if history:
+        # Answer depends on the conversation, not just the question
+        return await _call_llm(llm_client, question, history)
+    
+    key = (settings.LLM_PROVIDER, question)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_call_llm(llm_client, question, None))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one client disconnecting doesn't cancel it for the others
+    return await asyncio.shield(task)
+
+
+async def _explain_sql(llm_client: LLMClient, sql: str, question: str) -> str:
+    async with _llm_semaphore:
+        return await llm_client.aexplain_sql(sql, question)
+
+
+async def _resolve_sql(llm_client: LLMClient, request: QueryRequest) -> str:
+    """SQL for the question: from a template, the cache, or the LLM."""
+    # Templates don't account for conversation history
+    sql = None if request.history else match_template(request.question)
+    if not sql:
+        # A paraphrase from another conversation is no answer to a follow-up
+        sql = await run_in_threadpool(
+            llm_cache.get, request.question, settings.LLM_PROVIDER, semantic=not request.history
+        )
+    if not sql:
+        sql = await _generate_sql(llm_client, request.question, request.history)
+    return sql
+
+
+def _question_rejected(reason: str) -> SQLValidationResult:
+    return SQLValidationResult(
+        is_valid=False,
+        error_message=reason,
+        blocked_reason=reason,
+        policy_violated="question_filter"
+    )
+
 
 @router.post("/", response_model=QueryResponse)
 async def process_natural_language_query(
     request: QueryRequest,
-    current_user: User = Depends(require_permission(PermissionType.EXECUTE_QUERY)),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_permission(PermissionType.EXECUTE_QUERY))
 ):
     """
     Process a natural language query and return SQL results.
     
     Workflow:
-    1. Check Cache
+    1. Reject disallowed questions; check templates and cache
     2. Generate SQL from natural language using LLM (if not cached)
     3. Validate SQL against safety policies and user permissions
-    4. Execute SQL if valid (unless dry_run=True)
+    4. Execute SQL if valid (unless dry_run=True), generating the
+       explanation (if requested) concurrently
     5. Return results with metrics
     6. Log to audit trail
     """
@@ -63,49 +157,67 @@ async def process_natural_language_query(
     generated_sql = ""
     validation_result = None
     results = None
+    columns = None
+    row_count = None
     error_message = None
-    from_cache = False
+    explain_task = None
     
     try:
-        # Step 1: Check Cache
-        cached_sql = llm_cache.get(request.question, settings.LLM_PROVIDER)
-        if cached_sql:
-            generated_sql = cached_sql
-            from_cache = True
-        else:
-            # Step 2: Generate SQL using LLM
-            llm_start = time.time()
-            try:
-                llm_client = get_llm_client()
-                prompt = get_text_to_sql_prompt(request.question)
-                generated_sql = llm_client.generate_sql(prompt, history=request.history)
-                
-                # Clean SQL
-                generated_sql = generated_sql.replace("```sql", "").replace("```", "").strip()
-                
-                # Cache result
-                llm_cache.set(request.question, settings.LLM_PROVIDER, generated_sql)
-                
-                # Metrics
-                LLM_REQUEST_COUNT.labels(provider=settings.LLM_PROVIDER, model="default").inc()
-                LLM_LATENCY.labels(provider=settings.LLM_PROVIDER, model="default").observe(time.time() - llm_start)
-                
-            except Exception as e:
-                LLM_REQUEST_COUNT.labels(provider=settings.LLM_PROVIDER, model="default").inc() # Count errors too?
-                raise e
+        # Step 1: Pre-LLM fast path. Questions asking for writes or trying
+        # to override instructions are rejected outright; known questions
+        # are answered from templates (in-process) before the cache.
+        rejection = reject_question(request.question)
+        if rejection:
+            execution_time_ms = (time.time() - start_time) * 1000
+            audit_writer.submit(
+                user_id=current_user.id,
+                natural_language_query=request.question,
+                generated_sql="",
+                execution_status="blocked",
+                execution_time_ms=execution_time_ms,
+                rows_returned=0,
+                validation_status="blocked",
+                validation_reason=rejection,
+                endpoint="/api/v1/query"
+            )
+            return QueryResponse(
+                question=request.question,
+                generated_sql="",
+                validation=_question_rejected(rejection),
+                execution_time_ms=execution_time_ms,
+                error=rejection
+            )
+        
+        # One client (and its connection pool) for generation and explanation
+        llm_client = get_llm_client()
+        
+        # Step 2: Generate SQL using LLM (if not templated or cached)
+        generated_sql = await _resolve_sql(llm_client, request)
         
         # Step 3: Validate SQL (Advanced Validator)
         validator = SQLValidator(current_user)
-        validation_result = validator.validate_and_explain(generated_sql)
+        validation_result = await run_in_threadpool(validator.validate_and_explain, generated_sql)
         
         is_valid = validation_result.is_valid
         error_msg = validation_result.error_message
         
+        # The explanation only needs the SQL, so it is requested while the
+        # query executes. Validation is cheap and runs first: a cancelled
+        # task would not stop the provider call already in flight, and
+        # blocked queries should not pay for one.
+        if request.explain and is_valid:
+            explain_task = asyncio.create_task(_explain_sql(llm_client, generated_sql, request.question))
+        
         # Step 4: Execute SQL (if valid and not dry run)
         if is_valid and not request.dry_run:
             sql_start = time.time()
             try:
-                results = execute_sql_query(generated_sql)
+                if request.result_format == "columns":
+                    columns = await run_in_threadpool(execute_sql_query_columnar, generated_sql)
+                    row_count = len(next(iter(columns.values()), ()))
+                else:
+                    results = await run_in_threadpool(execute_sql_query, generated_sql)
+                    row_count = len(results)
                 SQL_QUERY_COUNT.labels(status="success").inc()
                 SQL_EXECUTION_TIME.observe(time.time() - sql_start)
             except QueryExecutionError as e:
@@ -114,44 +226,46 @@ async def process_natural_language_query(
                 validation_result.error_message = error_message
                 SQL_QUERY_COUNT.labels(status="failed").inc()
         
-        # Step 5: Generate explanation if requested
+        # Step 5: Collect explanation if requested
         explanation = None
-        if request.explain and is_valid:
+        if explain_task is not None:
             # We don't cache explanations for now, but we could
-            explanation = get_llm_client().explain_sql(generated_sql, request.question)
+            explanation = await explain_task
         
         execution_time_ms = (time.time() - start_time) * 1000
         
-        # Step 6: Audit logging
-        audit_entry = AuditLog(
+        # Step 6: Audit logging (batched off the request path)
+        audit_writer.submit(
             user_id=current_user.id,
             natural_language_query=request.question,
             generated_sql=generated_sql,
-            execution_status="success" if is_valid and results is not None else "blocked" if not is_valid else "dry_run",
+            execution_status="success" if is_valid and row_count is not None else "blocked" if not is_valid else "dry_run",
             execution_time_ms=execution_time_ms,
-            rows_returned=len(results) if results else 0,
+            rows_returned=row_count or 0,
             error_message=error_message,
             validation_status="allowed" if is_valid else "blocked",
             validation_reason=error_msg if not is_valid else None,
             endpoint="/api/v1/query"
         )
-        db.add(audit_entry)
-        db.commit()
         
         return QueryResponse(
             question=request.question,
             generated_sql=generated_sql,
             validation=validation_result,
             results=results,
-            row_count=len(results) if results else None,
+            columns=columns,
+            row_count=row_count or None,
             execution_time_ms=execution_time_ms,
             explanation=explanation,
             error=error_message
         )
         
     except Exception as e:
+        if explain_task is not None:
+            explain_task.cancel()
+        
         # Log error
-        audit_entry = AuditLog(
+        audit_writer.submit(
             user_id=current_user.id,
             natural_language_query=request.question,
             generated_sql=generated_sql or "",
@@ -161,8 +275,6 @@ async def process_natural_language_query(
             validation_status="error",
             endpoint="/api/v1/query"
         )
-        db.add(audit_entry)
-        db.commit()
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -170,25 +282,209 @@ async def process_natural_language_query(
         )
 
 
+# Streamed rows are sent in chunks of about this size, so each write (and
+# threadpool hop for the sync generator) carries many rows
+_STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _ndjson_chunks(rows: Iterator[Dict[str, Any]], summary: Dict[str, Any]) -> Iterator[bytes]:
+    # Runs in the threadpool: encodes rows and groups them into chunks,
+    # recording the row count and any execution error in ``summary``
+    buffer = bytearray()
+    try:
+        for row in rows:
+            buffer += orjson.dumps(row, default=str)
+            buffer += b"\n"
+            summary["row_count"] += 1
+            if len(buffer) >= _STREAM_CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+    except QueryExecutionError as e:
+        summary["error"] = str(e)
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _stream_query_results(
+    user_id: int,
+    request: QueryRequest,
+    generated_sql: str,
+    validation_result: SQLValidationResult,
+    start_time: float
+) -> AsyncIterator[bytes]:
+    summary: Dict[str, Any] = {"row_count": 0, "error": None}
+    is_valid = validation_result.is_valid
+    executes = is_valid and not request.dry_run
+    completed = False
+    try:
+        yield orjson.dumps({
+            "question": request.question,
+            "generated_sql": generated_sql,
+            "validation": validation_result.model_dump()
+        }) + b"\n"
+        
+        if executes:
+            sql_start = time.time()
+            rows = execute_sql_query_stream(generated_sql)
+            try:
+                async for chunk in iterate_in_threadpool(_ndjson_chunks(rows, summary)):
+                    yield chunk
+            finally:
+                # Releases the connection even if the client went away
+                rows.close()
+            if summary["error"]:
+                SQL_QUERY_COUNT.labels(status="failed").inc()
+            else:
+                SQL_QUERY_COUNT.labels(status="success").inc()
+                SQL_EXECUTION_TIME.observe(time.time() - sql_start)
+        
+        summary["execution_time_ms"] = (time.time() - start_time) * 1000
+        yield orjson.dumps(summary) + b"\n"
+        completed = True
+    finally:
+        # Runs on the event loop whether the body finished, the client
+        # disconnected or sending failed, so executed SQL is always audited
+        if executes and not completed and not summary["error"]:
+            summary["error"] = "Stream interrupted before completion"
+        if not is_valid:
+            execution_status = "blocked"
+        elif request.dry_run:
+            execution_status = "dry_run"
+        elif summary["error"]:
+            execution_status = "error"
+        else:
+            execution_status = "success"
+        
+        audit_writer.submit(
+            user_id=user_id,
+            natural_language_query=request.question,
+            generated_sql=generated_sql,
+            execution_status=execution_status,
+            execution_time_ms=(time.time() - start_time) * 1000,
+            rows_returned=summary["row_count"],
+            error_message=summary["error"],
+            validation_status="allowed" if is_valid else "blocked",
+            validation_reason=validation_result.error_message if not is_valid else None,
+            endpoint="/api/v1/query/stream"
+        )
+
+
+@router.post("/stream")
+async def stream_natural_language_query(
+    request: QueryRequest,
+    current_user: User = Depends(require_permission(PermissionType.EXECUTE_QUERY))
+):
+    """
+    Process a natural language query and stream the results as NDJSON.
+    
+    Line format:
+    - first: question, generated_sql and validation
+    - then: one object per result row
+    - last: row_count, execution_time_ms and error
+    
+    Rows are read through a server-side cursor and sent as they arrive, so
+    large results are never held in memory. Explanations are not generated
+    here; use POST /query/ for those.
+    """
+    start_time = time.time()
+    generated_sql = ""
+    
+    try:
+        rejection = reject_question(request.question)
+        if rejection:
+            validation_result = _question_rejected(rejection)
+        else:
+            generated_sql = await _resolve_sql(get_llm_client(), request)
+            validator = SQLValidator(current_user)
+            validation_result = await run_in_threadpool(validator.validate_and_explain, generated_sql)
+    except Exception as e:
+        audit_writer.submit(
+            user_id=current_user.id,
+            natural_language_query=request.question,
+            generated_sql=generated_sql,
+            execution_status="error",
+            execution_time_ms=(time.time() - start_time) * 1000,
+            error_message=str(e),
+            validation_status="error",
+            endpoint="/api/v1/query/stream"
+        )
+        
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    
+    return StreamingResponse(
+        _stream_query_results(current_user.id, request, generated_sql, validation_result, start_time),
+        media_type="application/x-ndjson"
+    )
+
+
+# Columns the history view needs; skips error/validation text and request context
+_HISTORY_COLUMNS = (
+    AuditLog.id,
+    AuditLog.natural_language_query,
+    AuditLog.generated_sql,
+    AuditLog.execution_status,
+    AuditLog.execution_time_ms,
+    AuditLog.rows_returned,
+    AuditLog.timestamp,
+    AuditLog.user_id,
+)
+
+
+def _encode_history_cursor(log) -> str:
+    raw = f"{log.timestamp.isoformat()}|{log.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        timestamp, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid history cursor"
+        )
+
+
 @router.get("/history", response_model=QueryHistoryResponse)
-async def get_query_history(
+def get_query_history(
     pagination: PaginationParams = Depends(),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get query history for the current user.
     
-    Returns paginated list of past queries with their status and metrics.
+    Returns paginated list of past queries with their status and metrics,
+    newest first. Follow ``next_cursor`` for further pages: keyset paging on
+    (timestamp, id) costs the same at any depth, unlike ``page`` which is
+    still accepted when no cursor is given.
     """
     # Query audit logs for this user
-    query = db.query(AuditLog).filter(AuditLog.user_id == current_user.id)
-    total = query.count()
+    query = (
+        db.query(*_HISTORY_COLUMNS)
+        .filter(AuditLog.user_id == current_user.id)
+        .order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+    )
+    if cursor:
+        query = query.filter(tuple_(AuditLog.timestamp, AuditLog.id) < _decode_history_cursor(cursor))
+    else:
+        query = query.offset(pagination.offset)
     
-    logs = query.order_by(AuditLog.timestamp.desc()).offset(pagination.offset).limit(pagination.page_size).all()
+    # One extra row tells us whether another page exists
+    logs = query.limit(pagination.page_size + 1).all()
+    next_cursor = None
+    if len(logs) > pagination.page_size:
+        logs = logs[:pagination.page_size]
+        next_cursor = _encode_history_cursor(logs[-1])
     
+    # Rows come straight from the typed ORM columns, so skip re-validation
     history_items = [
-        QueryHistoryItem(
+        QueryHistoryItem.model_construct(
             id=log.id,
             question=log.natural_language_query,
             generated_sql=log.generated_sql,
@@ -203,5 +499,5 @@ async def get_query_history(
     
     return QueryHistoryResponse(
         queries=history_items,
-        total=total
+        next_cursor=next_cursor
     )
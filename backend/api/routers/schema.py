@@ -6,8 +6,10 @@ Provides endpoints to:
 - Get table information
 - Update schema metadata for semantic search
 """
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import inspect, text
 
@@ -21,63 +23,145 @@ from backend.auth.dependencies import get_current_user
 from backend.auth.models import User
 from backend.database.connection import get_db, engine
 from backend.database.models import SchemaMetadata
+from backend.config.settings import settings
 
 router = APIRouter(prefix="/schema", tags=["Schema"])
 
+# Planner statistics: one round-trip for every table, no table scans
+_ROW_ESTIMATE_SQL = {
+    "postgresql": (
+        "SELECT c.relname, c.reltuples::bigint FROM pg_class c "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relkind = 'r' AND n.nspname = current_schema()"
+    ),
+    "mysql": (
+        "SELECT table_name, table_rows FROM information_schema.tables "
+        "WHERE table_schema = DATABASE()"
+    ),
+    # Populated by ANALYZE; the first field of stat is the table's row count
+    "sqlite": "SELECT tbl, MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 GROUP BY tbl",
+}
 
-@router.get("/", response_model=SchemaResponse)
-async def get_database_schema(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Get the current database schema.
+
+def _estimated_row_counts(db: Session) -> Dict[str, int]:
+    """Row count estimates for all tables, from the dialect's statistics."""
+    sql = _ROW_ESTIMATE_SQL.get(engine.dialect.name)
+    if sql is None:
+        return {}
+    try:
+        rows = db.execute(text(sql)).all()
+    except Exception:
+        # Statistics unavailable (e.g. SQLite before ANALYZE)
+        db.rollback()
+        return {}
+    # Postgres reports -1 for tables that have never been analyzed
+    return {name: int(count) for name, count in rows if count is not None and count >= 0}
+
+
+# (expires_at, [(table_name, columns), ...]) for the inspected schema
+_schema_cache: Optional[Tuple[float, List[Tuple[str, List[ColumnInfo]]]]] = None
+_schema_cache_lock = threading.Lock()
+
+
+def _inspect_tables() -> List[Tuple[str, List[ColumnInfo]]]:
+    """Table and column structure, served from cache within the TTL."""
+    global _schema_cache
+    now = time.monotonic()
+    with _schema_cache_lock:
+        if _schema_cache is not None and _schema_cache[0] > now:
+            return _schema_cache[1]
     
-    Returns information about all tables, columns, and types.
-    """
+    # One catalog query per kind of metadata for the whole schema, keyed
+    # by (schema, table) with schema None for the default schema
     inspector = inspect(engine)
-    table_names = inspector.get_table_names()
-    
-    tables: List[TableInfo] = []
+    all_columns = inspector.get_multi_columns()
+    all_pks = inspector.get_multi_pk_constraint()
+    all_fks = inspector.get_multi_foreign_keys()
+    tables: List[Tuple[str, List[ColumnInfo]]] = []
     
-    for table_name in table_names:
-        columns_info = inspector.get_columns(table_name)
-        pk_constraint = inspector.get_pk_constraint(table_name)
-        fk_constraints = inspector.get_foreign_keys(table_name)
+    for table_name in inspector.get_table_names():
+        key = (None, table_name)
+        columns_info = all_columns.get(key, [])
+        pk_constraint = all_pks.get(key) or {}
+        fk_constraints = all_fks.get(key, [])
+        
+        # Index keys once per table so each column is an O(1) lookup;
+        # the first constraint wins if a column is in several
+        pk_columns = set(pk_constraint.get('constrained_columns') or ())
+        fk_targets = {}
+        for fk_constraint in fk_constraints:
+            for column, referred in zip(fk_constraint['constrained_columns'], fk_constraint['referred_columns']):
+                fk_targets.setdefault(column, f"{fk_constraint['referred_table']}.{referred}")
         
         # Build column information
         columns: List[ColumnInfo] = []
         for col in columns_info:
-            # Check if primary key
-            is_pk = col['name'] in pk_constraint.get('constrained_columns', [])
-            
-            # Check for foreign keys
-            fk = None
-            for fk_constraint in fk_constraints:
-                if col['name'] in fk_constraint['constrained_columns']:
-                    fk = f"{fk_constraint['referred_table']}.{fk_constraint['referred_columns'][0]}"
-                    break
-            
-            columns.append(ColumnInfo(
+            columns.append(ColumnInfo.model_construct(
                 name=col['name'],
                 type=str(col['type']),
                 nullable=col.get('nullable', True),
-                primary_key=is_pk,
-                foreign_key=fk
+                primary_key=col['name'] in pk_columns,
+                foreign_key=fk_targets.get(col['name'])
             ))
         
-        # Get row count (optional - can be expensive for large tables)
-        try:
-            result = db.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-            row_count = result.scalar()
-        except:
-            row_count = None
-        
-        tables.append(TableInfo(
-            name=table_name,
-            columns=columns,
-            row_count=row_count
-        ))
+        tables.append((table_name, columns))
+    
+    if settings.SCHEMA_CACHE_TTL_SECONDS > 0:
+        with _schema_cache_lock:
+            _schema_cache = (now + settings.SCHEMA_CACHE_TTL_SECONDS, tables)
+    return tables
+
+
+def invalidate_schema_cache() -> None:
+    """Drop the cached schema so the next request re-inspects the database."""
+    global _schema_cache
+    with _schema_cache_lock:
+        _schema_cache = None
+
+
+def _exact_row_counts(db: Session, table_names: List[str]) -> Dict[str, int]:
+    """Exact row counts for the given tables in a single UNION ALL query."""
+    if not table_names:
+        return {}
+    quote = engine.dialect.identifier_preparer.quote
+    sql = " UNION ALL ".join(
+        f"SELECT :t{i}, COUNT(*) FROM {quote(name)}" for i, name in enumerate(table_names)
+    )
+    params = {f"t{i}": name for i, name in enumerate(table_names)}
+    try:
+        return dict(db.execute(text(sql), params).all())
+    except Exception:
+        db.rollback()
+        return {}
+
+
+@router.get("/", response_model=SchemaResponse)
+def get_database_schema(
+    exact: bool = Query(False, description="Exact row counts (scans every table) instead of estimates"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the current database schema.
+    
+    Returns information about all tables, columns, and types. Structure is
+    cached for SCHEMA_CACHE_TTL_SECONDS; row counts are fetched per request
+    and are planner estimates unless ``exact=true`` (SQLite tables without
+    ANALYZE statistics are counted exactly).
+    """
+    inspected = _inspect_tables()
+    table_names = [name for name, _ in inspected]
+    
+    row_counts = {} if exact else _estimated_row_counts(db)
+    if exact or engine.dialect.name == "sqlite":
+        missing = [name for name in table_names if name not in row_counts]
+        row_counts.update(_exact_row_counts(db, missing))
+    
+    # Built from inspector output, so skip per-item validation
+    tables = [
+        TableInfo.model_construct(name=table_name, columns=columns, row_count=row_counts.get(table_name))
+        for table_name, columns in inspected
+    ]
     
     return SchemaResponse(
         database_type=str(engine.url.drivername),
@@ -87,7 +171,7 @@ async def get_database_schema(
 
 
 @router.post("/metadata", status_code=201)
-async def create_schema_metadata(
+def create_schema_metadata(
     metadata: SchemaMetadataRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -122,5 +206,6 @@ async def create_schema_metadata(
         db.add(new_metadata)
     
     db.commit()
+    invalidate_schema_cache()
     
     return {"message": "Metadata saved successfully"}
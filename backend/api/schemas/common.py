@@ -52,9 +52,14 @@ class PaginatedResponse(BaseModel):
     
     @classmethod
     def create(cls, items: List[Any], total: int, pagination: PaginationParams):
-        """Create a paginated response."""
+        """
+        Create a paginated response.
+        
+        Skips validation: items are already validated models and the
+        counts are computed here.
+        """
         total_pages = (total + pagination.page_size - 1) // pagination.page_size
-        return cls(
+        return cls.model_construct(
             items=items,
             total=total,
             page=pagination.page,
@@ -3,7 +3,7 @@ Query-related schemas for the API.
 
 Defines request/response models for natural language query endpoints.
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -29,6 +29,10 @@ class QueryRequest(BaseModel):
         False,
         description="If true, include explanation of generated SQL"
     )
+    result_format: Literal["rows", "columns"] = Field(
+        "rows",
+        description="Return results as a list of row objects ('rows') or as one list per column ('columns')"
+    )
     user_id: Optional[str] = Field(
         None,
         description="Optional user identifier for logging"
@@ -53,6 +57,10 @@ class QueryResponse(BaseModel):
     generated_sql: str
     validation: SQLValidationResult
     results: Optional[List[Dict[str, Any]]] = None
+    columns: Optional[Dict[str, List[Any]]] = Field(
+        None,
+        description="Column name to values, set instead of results when result_format is 'columns'"
+    )
     row_count: Optional[int] = None
     execution_time_ms: Optional[float] = None
     explanation: Optional[str] = None
@@ -76,4 +84,5 @@ class QueryHistoryItem(BaseModel):
 class QueryHistoryResponse(BaseModel):
     """Query history response."""
     queries: List[QueryHistoryItem]
-    total: int
+    total: Optional[int] = Field(None, description="Not computed; page with next_cursor instead")
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to fetch the next page")
@@ -5,6 +5,9 @@ Provides dependency functions for:
 - Getting the current user from JWT token
 - Requiring specific permissions
 - Database session management
+
+Dependencies that query the database are plain ``def`` so FastAPI runs them
+in its threadpool rather than blocking the event loop.
 """
 from typing import Optional
 
@@ -21,12 +24,14 @@ from backend.database.connection import get_db
 security = HTTPBearer()
 
 
-async def get_current_user(
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
     """
-    Dependency to get the current authenticated user from JWT token.
+    Dependency to get the current authenticated user from a bearer token.
+    
+    The token is either a JWT from /auth/login or an API key (``sk_`` prefix).
     
     Args:
         credentials: HTTP Bearer token
@@ -41,7 +46,7 @@ async def get_current_user(
     token = credentials.credentials
     
     try:
-        token_data = AuthService.decode_access_token(token)
+        user = AuthService.get_user_by_token(db, token)
     except AuthenticationError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,8 +54,6 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = AuthService.get_user_by_id(db, token_data.user_id)
-    
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -146,7 +149,7 @@ def require_permission(required_permission: PermissionType):
 
 
 # Optional: Allow unauthenticated access (for development/testing)
-async def get_current_user_optional(
+def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
@@ -165,8 +168,7 @@ async def get_current_user_optional(
         return None
     
     try:
-        token_data = AuthService.decode_access_token(credentials.credentials)
-        user = AuthService.get_user_by_id(db, token_data.user_id)
+        user = AuthService.get_user_by_token(db, credentials.credentials)
         return user if user and user.is_active else None
     except AuthenticationError:
         return None
@@ -5,12 +5,15 @@ Defines User, Role, and Permission models with SQLAlchemy ORM.
 """
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from functools import cached_property, lru_cache
+from operator import attrgetter
+from typing import Annotated, FrozenSet, List, Optional
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import AfterValidator, BaseModel, Field, WithJsonSchema, field_validator
+from pydantic.networks import validate_email
 
 Base = declarative_base()
 
@@ -68,16 +71,27 @@ class User(Base):
     # Relationships
     roles = relationship("Role", secondary=user_roles, back_populates="users")
     
+    @cached_property
+    def role_names(self) -> FrozenSet[str]:
+        """Names of the user's roles, cached until the roles change."""
+        return frozenset(role.name for role in self.roles)
+
+    @cached_property
+    def permission_types(self) -> FrozenSet[str]:
+        """Permission types granted through the user's roles, cached like role_names."""
+        return frozenset(perm.permission_type for role in self.roles for perm in role.permissions)
+
     def has_role(self, role_name: str) -> bool:
         """Check if user has a specific role."""
-        return any(role.name == role_name for role in self.roles)
+        return role_name in self.role_names
     
     def has_permission(self, permission_type: PermissionType) -> bool:
         """Check if user has a specific permission through their roles."""
-        for role in self.roles:
-            if any(perm.permission_type == permission_type for perm in role.permissions):
-                return True
-        return False
+        return permission_type in self.permission_types
+
+    def _clear_role_cache(self) -> None:
+        self.__dict__.pop("role_names", None)
+        self.__dict__.pop("permission_types", None)
 
 
 class Role(Base):
@@ -109,11 +123,52 @@ class Permission(Base):
     roles = relationship("Role", secondary=role_permissions, back_populates="permissions")
 
 
+class APIKey(Base):
+    """API key for service-to-service callers, stored as a SHA-256 digest."""
+    __tablename__ = 'api_keys'
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    key_hash = Column(String(64), unique=True, nullable=False, index=True)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+@event.listens_for(User.roles, "append")
+@event.listens_for(User.roles, "remove")
+def _on_roles_changed(user, *args):
+    user._clear_role_cache()
+
+
+@event.listens_for(User, "expire")
+@event.listens_for(User, "refresh")
+def _on_user_reloaded(user, *args):
+    user._clear_role_cache()
+
+
 # Pydantic models for API requests/responses
 
+_role_name = attrgetter("name")
+
+
+@lru_cache(maxsize=10_000)
+def _validated_email(value: str) -> str:
+    # Same parsing and normalization as EmailStr, run once per distinct address
+    return validate_email(value)[1]
+
+
+# Drop-in for pydantic's EmailStr whose validation result is memoized
+CachedEmailStr = Annotated[
+    str,
+    AfterValidator(_validated_email),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
+
+
 class UserBase(BaseModel):
     """Base user schema."""
-    email: EmailStr
+    email: CachedEmailStr
     username: str = Field(..., min_length=3, max_length=50)
     full_name: Optional[str] = None
 
@@ -126,7 +181,7 @@ class UserCreate(UserBase):
 
 class UserUpdate(BaseModel):
     """Schema for updating a user."""
-    email: Optional[EmailStr] = None
+    email: Optional[CachedEmailStr] = None
     full_name: Optional[str] = None
     is_active: Optional[bool] = None
     roles: Optional[List[RoleEnum]] = None
@@ -143,6 +198,14 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+    @field_validator("roles", mode="before")
+    @classmethod
+    def role_names(cls, roles):
+        """Accept the ``User.roles`` relationship and keep only role names."""
+        if roles and not isinstance(roles[0], str):
+            return list(map(_role_name, roles))
+        return roles
+
 
 class Token(BaseModel):
     """JWT token response."""
@@ -151,6 +214,19 @@ class Token(BaseModel):
     expires_in: int  # seconds
 
 
+class APIKeyCreate(BaseModel):
+    """Schema for issuing an API key."""
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class APIKeyToken(BaseModel):
+    """Newly issued API key; the plain key is only ever returned here."""
+    id: int
+    name: str
+    api_key: str
+    created_at: datetime
+
+
 class TokenData(BaseModel):
     """Data encoded in JWT token."""
     user_id: Optional[int] = None
@@ -3,10 +3,12 @@ Role-Based Access Control (RBAC) implementation.
 
 Provides permission checking and policy enforcement based on user roles.
 """
-from typing import List, Optional, Set
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 
 from backend.auth.models import User, Role, Permission, RoleEnum, PermissionType
+from backend.database.repository import UPSERT_INSERTS
 
 
 class AccessDeniedError(Exception):
@@ -63,23 +65,48 @@ class RBACService:
         Returns:
             Set of permission types
         """
-        permissions = set()
-        
-        for role in user.roles:
-            try:
-                role_enum = RoleEnum(role.name)
-                # Add direct permissions for this role
-                permissions.update(RBACService.DEFAULT_ROLE_PERMISSIONS.get(role_enum, set()))
-                
-                # Add inherited permissions from role hierarchy
-                inherited_roles = RBACService.ROLE_HIERARCHY.get(role_enum, set())
-                for inherited_role in inherited_roles:
-                    permissions.update(RBACService.DEFAULT_ROLE_PERMISSIONS.get(inherited_role, set()))
-            except ValueError:
-                # Skip unknown roles
-                continue
-        
-        return permissions
+        return set(RBACService.get_role_permissions(user.role_names))
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def get_role_permissions(role_names: FrozenSet[str]) -> FrozenSet[PermissionType]:
+        """
+        Resolve the permissions granted by a set of roles, memoized per role set.
+        
+        Permissions come from the static role hierarchy (see
+        _EFFECTIVE_PERMISSIONS), so the result only depends on role names and
+        never needs invalidating.
+        
+        Args:
+            role_names: Names of the user's roles
+            
+        Returns:
+            Frozen set of permission types
+        """
+        return frozenset().union(*(
+            _EFFECTIVE_PERMISSIONS[role_name]
+            for role_name in role_names
+            if role_name in _EFFECTIVE_PERMISSIONS  # Skip unknown roles
+        ))
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def get_role_mask(role_names: FrozenSet[str]) -> int:
+        """
+        Bitmask form of get_role_permissions (see _PERMISSION_BIT).
+        
+        Testing a permission is then a single AND against this int.
+        
+        Args:
+            role_names: Names of the user's roles
+            
+        Returns:
+            OR of the permission bits granted by the roles
+        """
+        mask = 0
+        for role_name in role_names:
+            mask |= _ROLE_MASK.get(role_name, 0)  # Unknown roles grant nothing
+        return mask
 
     @staticmethod
     def check_permission(
@@ -107,20 +134,83 @@ class RBACService:
         if user.is_superuser:
             return True
         
-        user_permissions = RBACService.get_user_permissions(user)
+        return RBACService.check_permission_for_roles(
+            user.role_names, required_permission, resource_type, resource_name
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=10_000)
+    def check_permission_for_roles(
+        role_names: FrozenSet[str],
+        required_permission: PermissionType,
+        resource_type: Optional[str] = None,
+        resource_name: Optional[str] = None
+    ) -> bool:
+        """
+        Role-set form of check_permission, memoized per role set and resource.
         
-        # Check if user has the required permission
-        if required_permission not in user_permissions:
+        Args:
+            role_names: Names of the user's roles
+            required_permission: Permission to check
+            resource_type: Optional resource type (e.g., 'table')
+            resource_name: Optional resource name (e.g., 'sales')
+            
+        Returns:
+            True if the roles grant the permission, False otherwise
+        """
+        # Check if the roles grant the required permission
+        if not RBACService.get_role_mask(role_names) & _PERMISSION_BIT[required_permission]:
             return False
         
         # If resource-specific check is needed, verify access to that resource
         if resource_type and resource_name:
-            return RBACService.check_resource_access(
-                user, resource_type, resource_name
+            return RBACService.check_resource_access_for_roles(
+                role_names, resource_type, resource_name
             )
         
         return True
 
+    @staticmethod
+    def check_permissions_bulk(
+        user: User,
+        required_permission: PermissionType,
+        resource_type: str,
+        resource_names: Iterable[str]
+    ) -> Dict[str, bool]:
+        """
+        Check one permission against many resources in a single pass.
+        
+        Equivalent to calling check_permission for each resource name, but
+        the user's permissions and tier are resolved once for the whole list.
+        
+        Args:
+            user: User object
+            required_permission: Permission to check
+            resource_type: Resource type (e.g., 'table')
+            resource_names: Names of the resources to check
+            
+        Returns:
+            Mapping of resource name to whether access is granted
+        """
+        if not user.is_active:
+            return dict.fromkeys(resource_names, False)
+        
+        # Superusers have all permissions
+        if user.is_superuser:
+            return dict.fromkeys(resource_names, True)
+        
+        role_names = user.role_names
+        if not RBACService.get_role_mask(role_names) & _PERMISSION_BIT[required_permission]:
+            return dict.fromkeys(resource_names, False)
+        
+        tier = RBACService.role_tier(role_names)
+        if not resource_type or tier >= _TIER_ALL_ACCESS:
+            return dict.fromkeys(resource_names, True)
+        
+        allowed = _TIER_TABLES.get(tier, ()) if resource_type == "table" else ()
+        # An empty name means no resource-specific check, as in check_permission
+        return {name: not name or name.lower() in allowed for name in resource_names}
+
     @staticmethod
     def require_permission(
         user: User,
@@ -167,77 +257,89 @@ class RBACService:
         Returns:
             True if user has access, False otherwise
         """
+        return RBACService.check_resource_access_for_roles(
+            user.role_names, resource_type, resource_name
+        )
+
+    @staticmethod
+    def check_resource_access_for_roles(
+        role_names: FrozenSet[str],
+        resource_type: str,
+        resource_name: str
+    ) -> bool:
+        """
+        Role-set form of check_resource_access.
+        
+        Args:
+            role_names: Names of the user's roles
+            resource_type: Type of resource (e.g., 'table', 'schema')
+            resource_name: Name of the resource
+            
+        Returns:
+            True if the roles grant access, False otherwise
+        """
         # For now, implement basic logic
         # In production, this would check against a permission table
+        tier = RBACService.role_tier(role_names)
         
         # Admins and data scientists have access to all resources
-        if user.has_role(RoleEnum.ADMIN.value) or user.has_role(RoleEnum.DATA_SCIENTIST.value):
+        if tier >= _TIER_ALL_ACCESS:
             return True
         
         # Analysts and viewers have read access to common tables
         if resource_type == "table":
-            # Define accessible tables for each role
-            analyst_tables = {"sales", "customers", "products", "orders"}
-            viewer_tables = {"sales"}
-            
-            if user.has_role(RoleEnum.ANALYST.value):
-                return resource_name.lower() in analyst_tables
-            elif user.has_role(RoleEnum.VIEWER.value):
-                return resource_name.lower() in viewer_tables
+            return resource_name.lower() in _TIER_TABLES.get(tier, ())
         
         return False
 
     @staticmethod
-    def get_accessible_tables(user: User) -> List[str]:
+    @lru_cache(maxsize=64)
+    def role_tier(role_names: FrozenSet[str]) -> int:
+        """
+        Highest access tier among a set of roles (-1 if none is known).
+        
+        Args:
+            role_names: Names of the user's roles
+            
+        Returns:
+            Tier number from _ROLE_TIER
+        """
+        return max((_ROLE_TIER.get(name, -1) for name in role_names), default=-1)
+
+    @staticmethod
+    def get_accessible_tables(user: User) -> Tuple[str, ...]:
         """
-        Get list of tables a user can access.
+        Get the tables a user can access.
         
         Args:
             user: User object
             
         Returns:
-            List of table names
+            Table names, or ("*",) for all tables
         """
-        if user.has_role(RoleEnum.ADMIN.value) or user.has_role(RoleEnum.DATA_SCIENTIST.value):
-            return ["*"]  # All tables
-        elif user.has_role(RoleEnum.ANALYST.value):
-            return ["sales", "customers", "products", "orders"]
-        elif user.has_role(RoleEnum.VIEWER.value):
-            return ["sales"]
-        
-        return []
+        tier = RBACService.role_tier(user.role_names)
+        if tier >= _TIER_ALL_ACCESS:
+            return ("*",)  # All tables
+        return _TIER_TABLES.get(tier, ())
 
     @staticmethod
-    def get_accessible_columns(user: User, table_name: str) -> List[str]:
+    def get_accessible_columns(user: User, table_name: str) -> Tuple[str, ...]:
         """
-        Get list of columns a user can access in a specific table.
+        Get the columns a user can access in a specific table.
         
         Args:
             user: User object
             table_name: Name of the table
             
         Returns:
-            List of column names or ["*"] for all
+            Column names, or ("*",) for all
         """
-        if user.has_role(RoleEnum.ADMIN.value) or user.has_role(RoleEnum.DATA_SCIENTIST.value):
-            return ["*"]
-            
-        table_name = table_name.lower()
+        tier = RBACService.role_tier(user.role_names)
+        if tier >= _TIER_ALL_ACCESS:
+            return ("*",)
         
-        if user.has_role(RoleEnum.ANALYST.value):
-            # Analysts can see almost everything except PII
-            if table_name == "customers":
-                return ["id", "name", "email", "phone", "address", "created_at"] # Exclude SSN, Credit Card
-            return ["*"]
-            
-        elif user.has_role(RoleEnum.VIEWER.value):
-            # Viewers have limited view
-            if table_name == "customers":
-                return ["id", "name", "email"]
-            if table_name == "sales":
-                return ["id", "amount", "date", "product_id"] # Exclude profit margin etc.
-                
-        return ["*"] # Default to all if table access is granted (table check happens first)
+        # Default to all if table access is granted (table check happens first)
+        return _TIER_COLUMNS.get(tier, {}).get(table_name.lower(), ("*",))
 
     @staticmethod
     def can_execute_dangerous_query(user: User) -> bool:
@@ -250,12 +352,27 @@ class RBACService:
         Returns:
             True if allowed, False otherwise
         """
-        return (
-            user.is_superuser or
-            user.has_role(RoleEnum.ADMIN.value) or
-            user.has_role(RoleEnum.DATA_SCIENTIST.value)
+        return user.is_superuser or RBACService.can_execute_dangerous_query_for_roles(
+            user.role_names
         )
 
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def can_execute_dangerous_query_for_roles(role_names: FrozenSet[str]) -> bool:
+        """
+        Role-set form of can_execute_dangerous_query, memoized per role set.
+        
+        The answer depends only on role names, so the cache never needs
+        invalidating when a user's roles change.
+        
+        Args:
+            role_names: Names of the user's roles
+            
+        Returns:
+            True if any role allows dangerous queries
+        """
+        return RBACService.role_tier(role_names) >= _TIER_ALL_ACCESS
+
     @staticmethod
     def initialize_default_roles(db: Session) -> None:
         """
@@ -283,10 +400,70 @@ class RBACService:
             }
         ]
         
-        for role_data in default_roles:
-            existing_role = db.query(Role).filter(Role.name == role_data["name"]).first()
-            if not existing_role:
-                role = Role(**role_data)
-                db.add(role)
+        insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if insert is not None:
+            # One round trip; roles that already exist are left untouched
+            db.execute(
+                insert(Role.__table__)
+                .values(default_roles)
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+        else:
+            existing = {name for (name,) in db.query(Role.name).filter(
+                Role.name.in_([role_data["name"] for role_data in default_roles])
+            )}
+            db.add_all(
+                Role(**role_data) for role_data in default_roles
+                if role_data["name"] not in existing
+            )
         
         db.commit()
+
+
+# Direct plus inherited permissions per role name, resolved once at import
+_EFFECTIVE_PERMISSIONS: Dict[str, FrozenSet[PermissionType]] = {
+    role.value: frozenset().union(
+        RBACService.DEFAULT_ROLE_PERMISSIONS.get(role, set()),
+        *(RBACService.DEFAULT_ROLE_PERMISSIONS.get(inherited, set())
+          for inherited in RBACService.ROLE_HIERARCHY.get(role, set()))
+    )
+    for role in RoleEnum
+}
+
+# One bit per permission type, and each role's effective permissions as a mask
+_PERMISSION_BIT: Dict[PermissionType, int] = {
+    permission: 1 << i for i, permission in enumerate(PermissionType)
+}
+_ROLE_MASK: Dict[str, int] = {
+    role_name: sum(_PERMISSION_BIT[permission] for permission in permissions)
+    for role_name, permissions in _EFFECTIVE_PERMISSIONS.items()
+}
+
+# Access tiers: a user gets the access of their highest-tier role
+_ROLE_TIER: Dict[str, int] = {
+    RoleEnum.ADMIN.value: 3,
+    RoleEnum.DATA_SCIENTIST.value: 2,
+    RoleEnum.ANALYST.value: 1,
+    RoleEnum.VIEWER.value: 0,
+}
+
+# Tiers at or above this one can access every table and column
+_TIER_ALL_ACCESS = 2
+
+_TIER_TABLES: Dict[int, Tuple[str, ...]] = {
+    1: ("sales", "customers", "products", "orders"),
+    0: ("sales",),
+}
+
+# Column restrictions per tier and table; unlisted tables allow all columns
+_TIER_COLUMNS: Dict[int, Dict[str, Tuple[str, ...]]] = {
+    # Analysts can see almost everything except PII
+    1: {
+        "customers": ("id", "name", "email", "phone", "address", "created_at"),  # Exclude SSN, Credit Card
+    },
+    # Viewers have limited view
+    0: {
+        "customers": ("id", "name", "email"),
+        "sales": ("id", "amount", "date", "product_id"),  # Exclude profit margin etc.
+    },
+}
@@ -6,23 +6,56 @@ Provides:
 - JWT token generation and validation
 - User authentication
 """
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+import hashlib
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, raiseload, selectinload
 
-from backend.auth.models import User, Role, RoleEnum, TokenData
+from backend.auth.models import APIKey, User, Role, RoleEnum, TokenData
 from backend.config.settings import settings
 
 # Password hashing configuration
-pwd_context = CryptContext(schemes=["pbkdf2_sha256", "bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256", "bcrypt"],
+    deprecated="auto",
+    pbkdf2_sha256__rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 
-# JWT configuration
-SECRET_KEY = settings.JWT_SECRET_KEY
+# Hashing is CPU-bound and releases the GIL, so async callers run it on its
+# own pool instead of holding a slot in the shared request threadpool.
+_PWD_POOL = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count(),
+    thread_name_prefix="password-hash",
+)
+
+# JWT configuration (secret and expiry are read from settings at call time)
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = settings.JWT_EXPIRE_MINUTES
+
+# Bearer tokens with this prefix are API keys, not JWTs
+API_KEY_PREFIX = "sk_"
+
+# Decoded tokens keyed by a digest of the token, so clients re-presenting
+# the same token skip signature verification. Entries hold the decoded data
+# and the time after which they must not be served.
+_token_cache: Dict[bytes, Tuple[TokenData, float]] = {}
+_token_cache_lock = threading.Lock()
+
+# Roles and their permissions are loaded with the user in one batched
+# SELECT each, so permission checks never lazy-load. In debug builds any
+# other relationship access on these users raises instead of silently
+# issuing another query.
+_USER_LOAD_OPTIONS = (selectinload(User.roles).selectinload(Role.permissions),)
+if settings.DEBUG:
+    _USER_LOAD_OPTIONS += (raiseload("*"),)
 
 
 class AuthenticationError(Exception):
@@ -43,6 +76,20 @@ class AuthService:
         """Hash a password for storage."""
         return pwd_context.hash(password)
 
+    @staticmethod
+    async def averify_password(plain_password: str, hashed_password: str) -> bool:
+        """Async form of verify_password, run on the password hashing pool."""
+        return await asyncio.get_running_loop().run_in_executor(
+            _PWD_POOL, pwd_context.verify, plain_password, hashed_password
+        )
+
+    @staticmethod
+    async def aget_password_hash(password: str) -> str:
+        """Async form of get_password_hash, run on the password hashing pool."""
+        return await asyncio.get_running_loop().run_in_executor(
+            _PWD_POOL, pwd_context.hash, password
+        )
+
     @staticmethod
     def create_access_token(
         data: dict,
@@ -59,18 +106,19 @@ class AuthService:
             Encoded JWT token
         """
         to_encode = data.copy()
+        now = datetime.now(timezone.utc)
         
         if expires_delta:
-            expire = datetime.utcnow() + expires_delta
+            expire = now + expires_delta
         else:
-            expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            expire = now + timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
         
         to_encode.update({
             "exp": expire,
-            "iat": datetime.utcnow()
+            "iat": now
         })
         
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+        encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=ALGORITHM)
         return encoded_jwt
 
     @staticmethod
@@ -87,8 +135,33 @@ class AuthService:
         Raises:
             AuthenticationError: If token is invalid
         """
+        if settings.TOKEN_CACHE_TTL_SECONDS <= 0:
+            return AuthService._decode_access_token(token)[0]
+        
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        now = time.time()
+        cached = _token_cache.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        
+        token_data, expires_at = AuthService._decode_access_token(token)
+        
+        with _token_cache_lock:
+            if len(_token_cache) >= settings.TOKEN_CACHE_MAX_ENTRIES:
+                # Evict the oldest entry (dicts keep insertion order)
+                _token_cache.pop(next(iter(_token_cache)))
+            _token_cache[key] = (
+                token_data,
+                min(expires_at, now + settings.TOKEN_CACHE_TTL_SECONDS),
+            )
+        
+        return token_data
+
+    @staticmethod
+    def _decode_access_token(token: str) -> Tuple[TokenData, float]:
+        """Verify and decode a token; also return its expiry timestamp."""
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM])
             user_id: int = payload.get("user_id")
             username: str = payload.get("sub")
             roles: list = payload.get("roles", [])
@@ -96,11 +169,12 @@ class AuthService:
             if username is None or user_id is None:
                 raise AuthenticationError("Invalid token payload")
             
-            return TokenData(
+            token_data = TokenData(
                 user_id=user_id,
                 username=username,
                 roles=roles
             )
+            return token_data, payload.get("exp", 0)
         except JWTError as e:
             raise AuthenticationError(f"Could not validate token: {str(e)}")
 
@@ -121,10 +195,7 @@ class AuthService:
         Returns:
             User object if authentication successful, None otherwise
         """
-        # Try to find user by username or email
-        user = db.query(User).filter(
-            (User.username == username) | (User.email == username)
-        ).first()
+        user = AuthService._get_user_for_login(db, username)
         
         if not user:
             return None
@@ -137,6 +208,43 @@ class AuthService:
         
         return user
 
+    @staticmethod
+    async def aauthenticate_user(
+        db: Session,
+        username: str,
+        password: str
+    ) -> Optional[User]:
+        """
+        Async form of authenticate_user.
+        
+        The user lookup runs in a worker thread and the password check on
+        the password hashing pool, so neither blocks the event loop.
+        """
+        user = await asyncio.to_thread(AuthService._get_user_for_login, db, username)
+        
+        if not user:
+            return None
+        
+        if not await AuthService.averify_password(password, user.hashed_password):
+            return None
+        
+        if not user.is_active:
+            return None
+        
+        return user
+
+    @staticmethod
+    def _get_user_for_login(db: Session, username: str) -> Optional[User]:
+        # Look up by email or username, one indexed equality match each
+        # instead of an OR across both columns. Only identifiers containing
+        # "@" can be emails; they fall back to a username match, since
+        # usernames are not restricted from containing "@".
+        if "@" in username:
+            user = AuthService.get_user_by_email(db, username)
+            if user is not None:
+                return user
+        return AuthService.get_user_by_username(db, username)
+
     @staticmethod
     def create_user(
         db: Session,
@@ -191,14 +299,100 @@ class AuthService:
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
         """Get user by ID."""
-        return db.query(User).filter(User.id == user_id).first()
+        return db.query(User).options(*_USER_LOAD_OPTIONS).filter(User.id == user_id).first()
 
     @staticmethod
     def get_user_by_username(db: Session, username: str) -> Optional[User]:
         """Get user by username."""
-        return db.query(User).filter(User.username == username).first()
+        return db.query(User).options(*_USER_LOAD_OPTIONS).filter(User.username == username).first()
 
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         """Get user by email."""
-        return db.query(User).filter(User.email == email).first()
+        return db.query(User).options(*_USER_LOAD_OPTIONS).filter(User.email == email).first()
+
+    @staticmethod
+    def hash_api_key(api_key: str) -> str:
+        """SHA-256 hex digest under which an API key is stored."""
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    @staticmethod
+    def create_api_key(db: Session, user: User, name: str) -> Tuple[str, APIKey]:
+        """
+        Issue a new API key for a user.
+        
+        Args:
+            db: Database session
+            user: Owner of the key
+            name: Label identifying the calling service
+            
+        Returns:
+            Tuple of (plain API key, stored APIKey row)
+        """
+        api_key = API_KEY_PREFIX + secrets.token_urlsafe(32)
+        record = APIKey(
+            user_id=user.id,
+            name=name,
+            key_hash=AuthService.hash_api_key(api_key)
+        )
+        db.add(record)
+        db.commit()
+        db.refresh(record)
+        return api_key, record
+
+    @staticmethod
+    def get_user_by_api_key(db: Session, api_key: str) -> Optional[User]:
+        """
+        Get the active owner of an active API key.
+        
+        Keys are random 256-bit values, so a single unsalted SHA-256 is enough
+        to store them safely, and lookup is an indexed equality match on the
+        digest instead of a password-hash verification per request. Keys of
+        deactivated users resolve to no user, like revoked keys.
+        """
+        return db.query(User).options(*_USER_LOAD_OPTIONS).join(
+            APIKey, APIKey.user_id == User.id
+        ).filter(
+            APIKey.key_hash == AuthService.hash_api_key(api_key),
+            APIKey.is_active.is_(True),
+            User.is_active.is_(True)
+        ).first()
+
+    @staticmethod
+    def get_user_by_token(db: Session, token: str) -> Optional[User]:
+        """
+        Resolve a bearer token (JWT or API key) to its user.
+        
+        Raises:
+            AuthenticationError: If a JWT is invalid
+        """
+        if token.startswith(API_KEY_PREFIX):
+            return AuthService.get_user_by_api_key(db, token)
+        
+        token_data = AuthService.decode_access_token(token)
+        return AuthService.get_user_by_id(db, token_data.user_id)
+
+    @staticmethod
+    def get_user_by_email_or_username(
+        db: Session,
+        email: str,
+        username: str
+    ) -> Tuple[bool, bool]:
+        """
+        Check email and username availability in a single query.
+        
+        Args:
+            db: Database session
+            email: Email to look up
+            username: Username to look up
+            
+        Returns:
+            Tuple of (email_taken, username_taken)
+        """
+        matches = db.query(User.email, User.username).filter(
+            (User.email == email) | (User.username == username)
+        ).all()
+        
+        email_taken = any(row.email == email for row in matches)
+        username_taken = any(row.username == username for row in matches)
+        return email_taken, username_taken
@@ -10,6 +10,6 @@ Features:
 - Production/development modes
 """
 
-from backend.config.settings import settings
+from backend.config.settings import get_settings, settings
 
-__all__ = ['settings']
+__all__ = ['get_settings', 'settings']
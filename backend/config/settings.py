@@ -1,6 +1,7 @@
 ﻿import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import List, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -14,6 +15,9 @@ class Settings(BaseSettings):
     API_VERSION: str = "v1"
     DEBUG: bool = True
     ENVIRONMENT: Literal["development", "staging", "production"] = "development"
+    # Allowed browser origins outside development (JSON list in env).
+    # Development allows any origin.
+    CORS_ORIGINS: List[str] = []
     
     # Database Configuration
     DATABASE_TYPE: Literal["sqlite", "postgresql"] = "sqlite"
@@ -28,10 +32,19 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = "llmdbms"
     
+    # Connection pool (PostgreSQL/MySQL, file-backed SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    SQL_COMPILED_CACHE_SIZE: int = 1200  # Compiled statements kept per engine (SQLAlchemy default 500)
+    
     # JWT Configuration
     JWT_SECRET_KEY: str = "dev-secret-key-change-in-production-use-env-variable"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
+    PASSWORD_HASH_ROUNDS: int = 29000  # PBKDF2-SHA256 rounds for new hashes; lower only in tests
+    PASSWORD_HASH_WORKERS: int = 0  # Threads for async hashing; 0 = one per CPU
+    TOKEN_CACHE_TTL_SECONDS: int = 60  # Reuse decoded JWTs for this long (capped at expiry); 0 disables
+    TOKEN_CACHE_MAX_ENTRIES: int = 50_000  # Per worker process
     
     # LLM Configuration
     LLM_PROVIDER: Literal["openai", "anthropic", "local", "mock"] = "mock"
@@ -40,26 +53,41 @@ class Settings(BaseSettings):
     MODEL_NAME: str = "gpt-3.5-turbo"
     LLM_TEMPERATURE: float = 0.0
     LLM_MAX_TOKENS: int = 500
+    LLM_MAX_CONCURRENCY: int = 16  # In-flight LLM calls per worker process
     
     # LLM Caching
     ENABLE_LLM_CACHE: bool = True
     CACHE_TTL_SECONDS: int = 3600  # 1 hour
+    LLM_LOCAL_CACHE_TTL_SECONDS: int = 600  # In-process layer in front of Redis; 0 disables
+    LLM_LOCAL_CACHE_MAX_ENTRIES: int = 1024  # Per worker process
+    PROMPT_VERSION: str = "1"  # Part of every LLM cache key; bump when prompts change
+    SCHEMA_CACHE_TTL_SECONDS: int = 300  # Inspected table/column structure; 0 disables
+    ENABLE_SEMANTIC_CACHE: bool = False  # Match paraphrased questions by embedding similarity
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92  # Minimum cosine similarity for a hit
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 10_000  # Per model, per worker process
     
     # Redis Configuration (for caching)
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: str | None = None
+    REDIS_MAX_CONNECTIONS: int = 32  # Shared pool per worker process; callers wait briefly when exhausted
     
     # Safety Configuration
     SAFETY_MODE: Literal["strict", "moderate", "permissive"] = "strict"
     ALLOW_DANGEROUS_QUERIES: bool = False
     REQUIRE_QUERY_APPROVAL: bool = False  # Require manual approval for certain queries
+    ENABLE_QUERY_TEMPLATES: bool = True  # Answer known questions from templates without an LLM call
     
     # Observability
     LOG_LEVEL: str = "INFO"
+    LOG_REQUEST_START: bool = False  # Also log when a request arrives, not just on completion
+    LOG_BUFFER_BYTES: int = 0  # Production: batch JSON log lines into writes of this size; 0 writes each line
     ENABLE_METRICS: bool = True
     METRICS_PORT: int = 9090
+    AUDIT_BATCH_SIZE: int = 500  # Max audit log rows per background insert
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 0.5  # Max age of a pending audit batch
+    AUDIT_QUEUE_MAXSIZE: int = 10_000  # Beyond this, audit writes fall back to synchronous
     
     # Vector Store (Semantic Search)
     ENABLE_SEMANTIC_SEARCH: bool = False
@@ -96,5 +124,17 @@ class Settings(BaseSettings):
         return self.ENVIRONMENT == "development"
 
 
-settings = Settings()
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide settings, loading .env and validating only once.
+
+    Usable as a FastAPI dependency; tests can call ``get_settings.cache_clear()``
+    to pick up a changed environment.
+    """
+    return Settings()
+
+
+settings = get_settings()
 
@@ -7,37 +7,62 @@ Supports:
 """
 from typing import Generator
 
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from sqlalchemy.pool import StaticPool, QueuePool
 
 from backend.config.settings import settings
 
 # Create engine with appropriate configuration
 if settings.DATABASE_TYPE == "sqlite":
-    # SQLite configuration
+    # SQLite configuration. An in-memory database only exists on its one
+    # connection; a file database gets a real pool so readers run
+    # concurrently under WAL instead of queueing on a single connection.
+    _sqlite_in_memory = settings.SQLITE_DB_PATH in ("", ":memory:")
+    if _sqlite_in_memory:
+        _sqlite_pool = {"poolclass": StaticPool}
+    else:
+        _sqlite_pool = {
+            "poolclass": QueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+        }
+    
     engine = create_engine(
         settings.database_url,
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,  # SQLite works best with StaticPool
+        **_sqlite_pool,
+        query_cache_size=settings.SQL_COMPILED_CACHE_SIZE,
         echo=settings.DEBUG
     )
     
-    # Enable foreign keys for SQLite
+    # Pragmas are per connection, so they are applied as each one opens
     @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_conn, connection_record):
         cursor = dbapi_conn.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
+        if not _sqlite_in_memory:
+            # Readers no longer block on the writer (N readers + 1 writer).
+            # WAL persists in the database file, so only switch it once.
+            cursor.execute("PRAGMA journal_mode")
+            if cursor.fetchone()[0] != "wal":
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            # Read pages through the OS page cache instead of copying them
+            cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+        cursor.execute("PRAGMA temp_store=MEMORY")
         cursor.close()
 elif settings.DATABASE_TYPE == "mysql":
     # MySQL configuration
     engine = create_engine(
         settings.database_url,
         poolclass=QueuePool,
-        pool_size=5,
-        max_overflow=10,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
         pool_pre_ping=True,
         pool_recycle=3600, # Recycle connections to avoid timeouts
+        query_cache_size=settings.SQL_COMPILED_CACHE_SIZE,
         echo=settings.DEBUG
     )
 else:
@@ -45,9 +70,10 @@ else:
     engine = create_engine(
         settings.database_url,
         poolclass=QueuePool,
-        pool_size=5,
-        max_overflow=10,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
         pool_pre_ping=True,  # Verify connections before using
+        query_cache_size=settings.SQL_COMPILED_CACHE_SIZE,
         echo=settings.DEBUG
     )
 
@@ -58,11 +84,21 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Thread-local session registry for work outside the request cycle
+# (startup tasks, background writers). Callers must call
+# ScopedSession.remove() when their unit of work is done.
+ScopedSession = scoped_session(SessionLocal)
+
 
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency to get a database session.
     
+    Request sessions are created explicitly rather than taken from
+    ScopedSession: FastAPI may enter and exit a sync dependency on
+    different threadpool threads, so a thread-local registry could hand
+    out or remove another request's session.
+    
     Yields:
         Database session
         
@@ -90,3 +126,28 @@ def init_db() -> None:
     AuthBase.metadata.create_all(bind=engine)
     DatabaseBase.metadata.create_all(bind=engine)
 
+
+def warm_pool(size: int) -> int:
+    """
+    Pre-open pooled connections so the first requests skip the connect handshake.
+    
+    Connections are held open together until all of them are established,
+    otherwise the pool would just hand the same connection back each time.
+    
+    Args:
+        size: Number of connections to establish
+        
+    Returns:
+        Number of connections that were opened
+    """
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    
+    return len(connections)
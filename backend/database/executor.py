@@ -1,8 +1,9 @@
 ﻿"""
 Enhanced database executor with better error handling and result formatting.
 """
-from typing import List, Dict, Any, Optional
-from sqlalchemy import text
+from functools import lru_cache
+from typing import List, Dict, Any, Iterator, Optional
+from sqlalchemy import TextClause, text
 from sqlalchemy.exc import SQLAlchemyError
 
 from backend.database.connection import engine
@@ -13,16 +14,34 @@ class QueryExecutionError(Exception):
     pass
 
 
+@lru_cache(maxsize=1024)
+def _text(query: str) -> TextClause:
+    """
+    text() construct for a SQL string, memoized per string.
+    
+    Text clauses are immutable, so repeated queries reuse one object and skip
+    re-scanning the SQL for bind parameters; the engine's compiled cache then
+    serves the compiled form.
+    """
+    return text(query)
+
+
 def execute_sql_query(
     query: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    batch_size: int = 1000
 ) -> List[Dict[str, Any]]:
     """
     Execute a raw SQL query against the database and return results.
     
+    Rows are read through a server-side cursor and converted batch by batch,
+    so the full result is never held twice (driver rows plus dictionaries).
+    Use execute_sql_query_stream to avoid materializing the list at all.
+    
     Args:
         query: The SQL query to execute
         parameters: Optional query parameters for safe parameterization
+        batch_size: Rows fetched from the database per round trip
         
     Returns:
         List of rows as dictionaries
@@ -33,20 +52,16 @@ def execute_sql_query(
     try:
         with engine.connect() as connection:
             # Use text() for raw SQL with optional parameter binding
-            stmt = text(query)
-            
-            if parameters:
-                result = connection.execute(stmt, parameters)
-            else:
-                result = connection.execute(stmt)
+            result = connection.execution_options(
+                stream_results=True, yield_per=batch_size
+            ).execute(_text(query), parameters or {})
             
             # Check if query returns rows
             if result.returns_rows:
                 keys = list(result.keys())
-                rows = result.fetchall()
                 
                 # Convert to list of dictionaries
-                return [dict(zip(keys, row)) for row in rows]
+                return [dict(zip(keys, row)) for row in result]
             else:
                 # For non-returning queries (shouldn't happen with our validators)
                 connection.commit()
@@ -56,3 +71,91 @@ def execute_sql_query(
         raise QueryExecutionError(f"Database error: {str(e)}") from e
     except Exception as e:
         raise QueryExecutionError(f"Unexpected error: {str(e)}") from e
+
+
+def execute_sql_query_columnar(
+    query: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    batch_size: int = 10_000
+) -> Dict[str, List[Any]]:
+    """
+    Execute a raw SQL query and return results column by column.
+    
+    Rows are fetched in partitions of ``batch_size`` and transposed into one
+    list per column, which allocates O(columns) containers instead of a dict
+    per row and loads directly into pandas/polars.
+    
+    Args:
+        query: The SQL query to execute
+        parameters: Optional query parameters for safe parameterization
+        batch_size: Rows fetched from the database per round trip
+        
+    Returns:
+        Mapping of column name to that column's values, in row order
+        
+    Raises:
+        QueryExecutionError: If the query fails to execute
+    """
+    try:
+        with engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True, yield_per=batch_size
+            ).execute(_text(query), parameters or {})
+            
+            if not result.returns_rows:
+                return {}
+            
+            keys = list(result.keys())
+            columns: List[List[Any]] = [[] for _ in keys]
+            for partition in result.partitions():
+                for column, values in zip(columns, zip(*partition)):
+                    column.extend(values)
+            
+            return dict(zip(keys, columns))
+                
+    except SQLAlchemyError as e:
+        raise QueryExecutionError(f"Database error: {str(e)}") from e
+    except Exception as e:
+        raise QueryExecutionError(f"Unexpected error: {str(e)}") from e
+
+
+def execute_sql_query_stream(
+    query: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    batch_size: int = 500
+) -> Iterator[Dict[str, Any]]:
+    """
+    Execute a raw SQL query and yield result rows one at a time.
+    
+    Rows are fetched through a server-side cursor in batches of
+    ``batch_size``, so memory stays bounded regardless of result size.
+    The connection is held until the iterator is exhausted or closed.
+    
+    Args:
+        query: The SQL query to execute
+        parameters: Optional query parameters for safe parameterization
+        batch_size: Rows fetched from the database per round trip
+        
+    Yields:
+        Rows as dictionaries
+        
+    Raises:
+        QueryExecutionError: If the query fails to execute
+    """
+    try:
+        with engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True, yield_per=batch_size
+            ).execute(_text(query), parameters or {})
+            
+            if not result.returns_rows:
+                return
+            
+            keys = list(result.keys())
+            for row in result:
+                yield dict(zip(keys, row))
+                
+    except SQLAlchemyError as e:
+        raise QueryExecutionError(f"Database error: {str(e)}") from e
+    except Exception as e:
+        raise QueryExecutionError(f"Unexpected error: {str(e)}") from e
@@ -0,0 +1,34 @@
+"""Add composite index for audit log history
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tables are created by init_db(); databases created after this index
+    # was added to the model already have it
+    op.create_index(
+        'ix_audit_logs_user_timestamp_id',
+        'audit_logs',
+        ['user_id', 'timestamp', 'id'],
+        postgresql_include=['execution_status', 'execution_time_ms', 'rows_returned'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_user_timestamp_id', table_name='audit_logs', if_exists=True)
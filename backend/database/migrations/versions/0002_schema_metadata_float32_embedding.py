@@ -0,0 +1,41 @@
+"""Store schema metadata embeddings as packed float32
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nothing populates embeddings yet, so existing values are not converted
+    with op.batch_alter_table('schema_metadata') as batch_op:
+        batch_op.alter_column(
+            'embedding',
+            existing_type=sa.JSON(),
+            type_=sa.LargeBinary(),
+            existing_nullable=True,
+            postgresql_using='NULL',
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('schema_metadata') as batch_op:
+        batch_op.alter_column(
+            'embedding',
+            existing_type=sa.LargeBinary(),
+            type_=sa.JSON(),
+            existing_nullable=True,
+            postgresql_using='NULL',
+        )
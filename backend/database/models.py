@@ -6,16 +6,47 @@ Includes:
 - Audit logs
 - Query cache
 """
+import sys
+from array import array
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Boolean, ForeignKey, Index, LargeBinary
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
 Base = declarative_base()
 
 
+class Float32Vector(TypeDecorator):
+    """
+    Float vector stored as packed little-endian float32 bytes.
+
+    Accepts any sequence of numbers and loads as ``array('f')``, which
+    numpy can wrap without copying (``np.frombuffer(vector, np.float32)``).
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        packed = array("f", value)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        return packed.tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        vector = array("f")
+        vector.frombytes(value)
+        if sys.byteorder == "big":
+            vector.byteswap()
+        return vector
+
+
 class SalesOrder(Base):
     """Sales order data model."""
     __tablename__ = "sales"
@@ -78,6 +109,17 @@ class AuditLog(Base):
     # Response
     response_sent = Column(Boolean, default=True)
 
+    __table_args__ = (
+        # Per-user history, newest first, keyset-paged on (timestamp, id).
+        # On Postgres the small history columns ride along in the index;
+        # the text columns are left out to stay under the btree row limit.
+        Index(
+            "ix_audit_logs_user_timestamp_id",
+            "user_id", "timestamp", "id",
+            postgresql_include=["execution_status", "execution_time_ms", "rows_returned"],
+        ),
+    )
+
 
 class QueryCache(Base):
     """Cache for LLM-generated SQL queries."""
@@ -124,7 +166,7 @@ class SchemaMetadata(Base):
     example_values = Column(Text, nullable=True)
     
     # Embeddings (for semantic search)
-    embedding = Column(JSON, nullable=True)  # Store as JSON array
+    embedding = Column(Float32Vector, nullable=True)  # 4 bytes per dimension
     
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
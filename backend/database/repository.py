@@ -4,12 +4,20 @@ Repository Pattern for Database Access.
 Abstracts the data access layer to allow switching between different
 database backends (SQLite, PostgreSQL) and mocks for testing.
 """
-from typing import Generic, TypeVar, Type, Optional, List, Any
-from sqlalchemy.orm import Session
-from backend.database.models import Base
+from datetime import datetime
+from typing import Generic, TypeVar, Type, Optional, List, Any, Dict, Sequence
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
+from backend.database.models import Base, QueryCache
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Dialects that can batch INSERT ... RETURNING and still return rows in
+# parameter order
+_ORDERED_RETURNING_DIALECTS = {"postgresql"}
+
 class BaseRepository(Generic[ModelType]):
     """
     Base repository with common CRUD operations.
@@ -22,18 +30,64 @@ class BaseRepository(Generic[ModelType]):
         """Get a single record by ID."""
         return self.db.query(self.model).filter(self.model.id == id).first()
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        """Get all records with pagination."""
-        return self.db.query(self.model).offset(skip).limit(limit).all()
+    def get_all(self, skip: int = 0, limit: int = 100, eager: Sequence[str] = ()) -> List[ModelType]:
+        """
+        Get all records with pagination.
+
+        Relationships named in ``eager`` are loaded with one extra SELECT
+        each for the whole page, instead of one query per row on access
+        (e.g. ``eager=("roles",)`` for User, ``("permissions",)`` for Role).
+        """
+        options = [selectinload(getattr(self.model, name)) for name in eager]
+        return self.db.query(self.model).options(*options).offset(skip).limit(limit).all()
+
+    def create(self, obj_in: dict, refresh: bool = False) -> ModelType:
+        """
+        Create a new record.
 
-    def create(self, obj_in: dict) -> ModelType:
-        """Create a new record."""
+        The committed object is expired, so its attributes (server defaults
+        included) are re-read on first access. Pass ``refresh=True`` to load
+        them eagerly instead.
+        """
         db_obj = self.model(**obj_in)
         self.db.add(db_obj)
         self.db.commit()
-        self.db.refresh(db_obj)
+        if refresh:
+            self.db.refresh(db_obj)
         return db_obj
 
+    def bulk_create(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert many records in a single transaction.
+
+        Rows are plain column dicts; no ORM objects are built or refreshed,
+        and the whole batch shares one commit (one WAL sync on SQLite).
+        """
+        if not rows:
+            return
+        with self.db.no_autoflush:
+            self.db.bulk_insert_mappings(self.model, rows)
+        self.db.commit()
+
+    def bulk_create_returning(self, rows: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Insert many records in a single transaction and return their IDs.
+
+        Emits multi-row ``INSERT ... VALUES (...), (...) RETURNING id``
+        batches instead of one statement per row. Rows with different key
+        sets go into separate batches. On PostgreSQL the IDs are in the
+        order of ``rows``; on other backends (SQLite) their order is
+        unspecified, since ordering RETURNING there costs one INSERT per row.
+        """
+        if not rows:
+            return []
+        ordered = self.db.get_bind().dialect.name in _ORDERED_RETURNING_DIALECTS
+        stmt = insert(self.model).returning(self.model.id, sort_by_parameter_order=ordered)
+        with self.db.no_autoflush:
+            ids = self.db.scalars(stmt, rows).all()
+        self.db.commit()
+        return ids
+
     def update(self, db_obj: ModelType, obj_in: dict) -> ModelType:
         """Update an existing record."""
         for field, value in obj_in.items():
@@ -43,9 +97,72 @@ class BaseRepository(Generic[ModelType]):
         self.db.refresh(db_obj)
         return db_obj
 
-    def delete(self, id: Any) -> ModelType:
-        """Delete a record by ID."""
-        obj = self.db.query(self.model).get(id)
-        self.db.delete(obj)
+    def bulk_update(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Update many records in a single transaction.
+
+        Each row must include the primary key ``id`` plus the columns to set.
+        """
+        if not rows:
+            return
+        with self.db.no_autoflush:
+            self.db.bulk_update_mappings(self.model, rows)
+        self.db.commit()
+
+    def delete(self, id: Any) -> int:
+        """
+        Delete a record by ID with a single DELETE statement.
+
+        Returns the number of rows deleted (0 if the ID does not exist).
+        """
+        result = self.db.execute(delete(self.model).where(self.model.id == id))
+        self.db.commit()
+        return result.rowcount
+
+
+# Dialect-specific INSERTs supporting ON CONFLICT DO NOTHING / DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+class QueryCacheRepository(BaseRepository[QueryCache]):
+    """
+    Repository for persisted LLM query cache entries.
+    """
+    def __init__(self, db: Session):
+        super().__init__(QueryCache, db)
+
+    def record_cache_use(self, cache_key: str, **fields: Any) -> None:
+        """
+        Insert a cache entry, or bump the usage stats of an existing one.
+
+        On SQLite/PostgreSQL this is a single
+        ``INSERT ... ON CONFLICT (cache_key) DO UPDATE`` statement, so
+        concurrent writers never race between a lookup and the write.
+
+        Args:
+            cache_key: Unique key of the entry
+            **fields: Column values used when the entry is new
+        """
+        now = datetime.utcnow()
+        insert_ = UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if insert_ is not None:
+            self.db.execute(
+                insert_(QueryCache)
+                .values(cache_key=cache_key, created_at=now, accessed_at=now, **fields)
+                .on_conflict_do_update(
+                    index_elements=["cache_key"],
+                    set_={"access_count": QueryCache.access_count + 1, "accessed_at": now},
+                )
+            )
+        else:
+            result = self.db.execute(
+                update(QueryCache)
+                .where(QueryCache.cache_key == cache_key)
+                .values(access_count=QueryCache.access_count + 1, accessed_at=now)
+            )
+            if result.rowcount == 0:
+                self.db.add(QueryCache(cache_key=cache_key, created_at=now, accessed_at=now, **fields))
         self.db.commit()
-        return obj
@@ -2,61 +2,201 @@
 LLM Response Caching Module.
 
 Provides a caching mechanism for LLM responses to reduce latency and costs.
-Supports Redis as the backend.
+Supports Redis as the backend behind a small in-process layer, with an
+optional semantic layer that matches paraphrased prompts by embedding
+similarity.
 """
-import json
 import hashlib
-from typing import Optional, Any
+import threading
+import time
+from functools import lru_cache
+from typing import Optional, Any, Dict, List, Tuple
 import redis
 from backend.config.settings import settings
 
 class LLMCache:
     """
     Cache for LLM responses using Redis.
+    
+    Hits are also kept in a per-process dict for up to
+    ``LLM_LOCAL_CACHE_TTL_SECONDS`` so repeated prompts skip the Redis round
+    trip. If Redis is unreachable the in-process layer is used on its own.
+    Keys include ``PROMPT_VERSION``, so bumping it invalidates both layers.
     """
     def __init__(self):
         self.enabled = settings.ENABLE_LLM_CACHE
         self.redis = None
+        self.local_ttl = settings.LLM_LOCAL_CACHE_TTL_SECONDS
+        self.local_max_entries = settings.LLM_LOCAL_CACHE_MAX_ENTRIES
+        self._local: Dict[str, Tuple[str, float]] = {}
+        self._local_lock = threading.Lock()
         if self.enabled:
             try:
-                self.redis = redis.Redis(
+                # Bounded pool shared by the threadpool workers; a burst
+                # waits up to a second for a free connection rather than
+                # failing into a cache miss (and an LLM call)
+                pool = redis.BlockingConnectionPool(
                     host=settings.REDIS_HOST,
                     port=settings.REDIS_PORT,
-                    db=0,
+                    db=settings.REDIS_DB,
+                    password=settings.REDIS_PASSWORD or None,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    timeout=1,
                     decode_responses=True,
                     socket_connect_timeout=1
                 )
+                self.redis = redis.Redis(connection_pool=pool)
                 self.redis.ping()
             except Exception as e:
                 print(f"Warning: Redis cache connection failed: {e}")
-                self.enabled = False
+                self.redis = None
+                self.enabled = self.local_ttl > 0
 
     def get(self, prompt: str, model: str) -> Optional[str]:
         """Retrieve cached response for a prompt."""
-        if not self.enabled or not self.redis:
+        if not self.enabled:
             return None
             
         key = self._generate_key(prompt, model)
+        cached = self._local.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        
+        if not self.redis:
+            return None
         try:
-            return self.redis.get(key)
+            response = self.redis.get(key)
         except Exception:
             return None
+        if response is not None:
+            self._set_local(key, response, self.local_ttl)
+        return response
 
     def set(self, prompt: str, model: str, response: str, ttl: int = 3600):
         """Cache a response."""
-        if not self.enabled or not self.redis:
+        if not self.enabled:
             return
             
         key = self._generate_key(prompt, model)
+        self._set_local(key, response, min(ttl, self.local_ttl))
+        if not self.redis:
+            return
         try:
             self.redis.setex(key, ttl, response)
         except Exception:
             pass
 
+    def _set_local(self, key: str, response: str, ttl: int):
+        if ttl <= 0 or self.local_max_entries <= 0:
+            return
+        with self._local_lock:
+            if key not in self._local and len(self._local) >= self.local_max_entries:
+                # Evict the oldest entry (dicts keep insertion order)
+                self._local.pop(next(iter(self._local)))
+            self._local[key] = (response, time.monotonic() + ttl)
+
     def _generate_key(self, prompt: str, model: str) -> str:
         """Generate a unique cache key."""
-        content = f"{model}:{prompt}"
+        content = f"{settings.PROMPT_VERSION}:{model}:{prompt}"
         return f"llm_cache:{hashlib.sha256(content.encode()).hexdigest()}"
 
+class SemanticLLMCache:
+    """
+    Semantic cache layered over the exact-match LLMCache.
+    
+    On an exact miss the prompt is embedded and compared by cosine similarity
+    with previously cached prompts for the same model; the closest one's
+    response is returned if it clears the similarity threshold. Embeddings
+    are kept in process memory, oldest evicted first. Like the exact cache,
+    entries expire after their ttl and are scoped to ``PROMPT_VERSION``.
+    """
+    def __init__(self, exact: LLMCache):
+        self.exact = exact
+        self.enabled = settings.ENABLE_SEMANTIC_CACHE
+        self.threshold = settings.SEMANTIC_CACHE_THRESHOLD
+        self.max_entries = settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self._lock = threading.Lock()
+        # Per (prompt version, model): unit-norm prompt embeddings, their
+        # responses and monotonic expiry times
+        self._vectors: Dict[Tuple[str, str], List[Any]] = {}
+        self._responses: Dict[Tuple[str, str], List[str]] = {}
+        self._expiries: Dict[Tuple[str, str], List[float]] = {}
+        self._matrices: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+
+    def get(self, prompt: str, model: str, semantic: bool = True) -> Optional[str]:
+        """
+        Retrieve the cached response for a prompt or a close paraphrase.
+        
+        Pass ``semantic=False`` when the answer depends on more than the
+        prompt (e.g. conversation history), so only exact matches are used.
+        """
+        cached = self.exact.get(prompt, model)
+        if cached is not None or not self.enabled or not semantic:
+            return cached
+        
+        key = (settings.PROMPT_VERSION, model)
+        with self._lock:
+            if not self._vectors.get(key):
+                return None
+            cached_matrix = self._matrices.get(key)
+            if cached_matrix is None:
+                import numpy as np
+                cached_matrix = self._matrices[key] = (
+                    np.vstack(self._vectors[key]),
+                    np.asarray(self._expiries[key]),
+                )
+            matrix, expiries = cached_matrix
+            responses = self._responses[key]
+        
+        scores = matrix @ _embed(prompt)
+        scores[expiries <= time.monotonic()] = -1.0
+        best = int(scores.argmax())
+        if scores[best] >= self.threshold:
+            return responses[best]
+        return None
+
+    def set(self, prompt: str, model: str, response: str, ttl: int = 3600, semantic: bool = True):
+        """Cache a response and, unless ``semantic=False``, index its prompt for semantic lookup."""
+        self.exact.set(prompt, model, response, ttl)
+        if not self.enabled or not semantic or ttl <= 0:
+            return
+        
+        vector = _embed(prompt)
+        key = (settings.PROMPT_VERSION, model)
+        now = time.monotonic()
+        with self._lock:
+            # Indexes built under an older prompt version can never match again
+            for stale in [k for k in self._vectors if k[0] != key[0]]:
+                self._drop(stale)
+            
+            # Rebuild rather than mutate so readers keep a consistent
+            # (matrix, responses) pair; expired entries are evicted here
+            live = [
+                i for i, expires_at in enumerate(self._expiries.get(key, [])) if expires_at > now
+            ]
+            self._vectors[key] = ([self._vectors[key][i] for i in live] + [vector])[-self.max_entries:]
+            self._responses[key] = ([self._responses[key][i] for i in live] + [response])[-self.max_entries:]
+            self._expiries[key] = ([self._expiries[key][i] for i in live] + [now + ttl])[-self.max_entries:]
+            self._matrices.pop(key, None)
+
+    def _drop(self, key: Tuple[str, str]):
+        for index in (self._vectors, self._responses, self._expiries, self._matrices):
+            index.pop(key, None)
+
+
+@lru_cache(maxsize=256)
+def _embed(text: str):
+    """Unit-norm embedding of a prompt (memoized: get and set embed the same miss)."""
+    import numpy as np
+    vector = np.asarray(_embedding_service().embed_query(text), dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+@lru_cache(maxsize=1)
+def _embedding_service():
+    from backend.semantic.embeddings import EmbeddingService
+    return EmbeddingService()
+
+
 # Global cache instance
-llm_cache = LLMCache()
+llm_cache = SemanticLLMCache(LLMCache())
@@ -1,11 +1,22 @@
 ﻿"""
 Enhanced LLM client with multi-provider support.
 """
+import asyncio
+import re
 from abc import ABC, abstractmethod
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 from backend.config.settings import settings
 
+# Leading/trailing markdown code fences around LLM output
+_SQL_FENCE_RE = re.compile(r"^\s*```(?:sql)?\s*|\s*```\s*$", re.IGNORECASE)
+
+
+def strip_sql_fences(text: str) -> str:
+    """Remove markdown code fences the model wrapped around its SQL."""
+    return _SQL_FENCE_RE.sub("", text).strip()
+
 
 class LLMClient(ABC):
     """Abstract base class for LLM clients."""
@@ -20,6 +31,19 @@ class LLMClient(ABC):
         """Explain a generated SQL query."""
         pass
 
+    async def agenerate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        """
+        Async variant of generate_sql.
+        
+        Defaults to running the blocking call in a worker thread; clients with
+        a native async API override this.
+        """
+        return await asyncio.to_thread(self.generate_sql, prompt, history)
+
+    async def aexplain_sql(self, sql: str, question: str) -> str:
+        """Async variant of explain_sql (worker thread by default)."""
+        return await asyncio.to_thread(self.explain_sql, sql, question)
+
 
 class MockLLMClient(LLMClient):
     """Mock LLM client for testing and development without API keys."""
@@ -49,14 +73,14 @@ class OpenAILLMClient(LLMClient):
             max_tokens=settings.LLM_MAX_TOKENS,
             api_key=api_key
         )
-        self._SystemMessage = SystemMessage
         self._HumanMessage = HumanMessage
         self._AIMessage = AIMessage
+        # System messages are identical on every call, so build them once
+        self._sql_system = SystemMessage(content="You are an expert SQL assistant. Return ONLY the SQL query, nothing else. Do not use markdown formatting.")
+        self._explain_system = SystemMessage(content="You are a helpful data analyst. Explain the SQL query in simple terms.")
 
-    def generate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
-        messages = [
-            self._SystemMessage(content="You are an expert SQL assistant. Return ONLY the SQL query, nothing else. Do not use markdown formatting.")
-        ]
+    def _sql_messages(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> list:
+        messages = [self._sql_system]
         
         if history:
             for msg in history:
@@ -66,16 +90,28 @@ class OpenAILLMClient(LLMClient):
                     messages.append(self._AIMessage(content=msg['content']))
         
         messages.append(self._HumanMessage(content=prompt))
-        
-        response = self.llm.invoke(messages)
-        return response.content.strip()
+        return messages
 
-    def explain_sql(self, sql: str, question: str) -> str:
-        messages = [
-            self._SystemMessage(content="You are a helpful data analyst. Explain the SQL query in simple terms."),
+    def _explain_messages(self, sql: str, question: str) -> list:
+        return [
+            self._explain_system,
             self._HumanMessage(content=f"Question: {question}\nSQL: {sql}\n\nExplain this query:")
         ]
-        response = self.llm.invoke(messages)
+
+    def generate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        response = self.llm.invoke(self._sql_messages(prompt, history))
+        return response.content.strip()
+
+    def explain_sql(self, sql: str, question: str) -> str:
+        response = self.llm.invoke(self._explain_messages(sql, question))
+        return response.content.strip()
+
+    async def agenerate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        response = await self.llm.ainvoke(self._sql_messages(prompt, history))
+        return response.content.strip()
+
+    async def aexplain_sql(self, sql: str, question: str) -> str:
+        response = await self.llm.ainvoke(self._explain_messages(sql, question))
         return response.content.strip()
 
 
@@ -88,6 +124,7 @@ class AnthropicLLMClient(LLMClient):
             raise ValueError("ANTHROPIC_API_KEY is not set in configuration.")
         
         from langchain_anthropic import ChatAnthropic
+        from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
         
         self.llm = ChatAnthropic(
             model="claude-3-sonnet-20240229",
@@ -95,34 +132,45 @@ class AnthropicLLMClient(LLMClient):
             max_tokens=settings.LLM_MAX_TOKENS,
             api_key=api_key
         )
+        self._HumanMessage = HumanMessage
+        self._AIMessage = AIMessage
+        # System messages are identical on every call, so build them once
+        self._sql_system = SystemMessage(content="You are an expert SQL assistant. Return ONLY the SQL query, nothing else.")
+        self._explain_system = SystemMessage(content="You are a helpful data analyst. Explain the SQL query in simple terms.")
 
-    def generate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
-        from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-        
-        messages = [
-            SystemMessage(content="You are an expert SQL assistant. Return ONLY the SQL query, nothing else."),
-        ]
+    def _sql_messages(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> list:
+        messages = [self._sql_system]
         
         if history:
             for msg in history:
                 if msg['role'] == 'user':
-                    messages.append(HumanMessage(content=msg['content']))
+                    messages.append(self._HumanMessage(content=msg['content']))
                 elif msg['role'] == 'assistant':
-                    messages.append(AIMessage(content=msg['content']))
+                    messages.append(self._AIMessage(content=msg['content']))
                     
-        messages.append(HumanMessage(content=prompt))
-        
-        response = self.llm.invoke(messages)
+        messages.append(self._HumanMessage(content=prompt))
+        return messages
+
+    def _explain_messages(self, sql: str, question: str) -> list:
+        return [
+            self._explain_system,
+            self._HumanMessage(content=f"Question: {question}\nSQL: {sql}\n\nExplain:")
+        ]
+
+    def generate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        response = self.llm.invoke(self._sql_messages(prompt, history))
         return response.content.strip()
 
     def explain_sql(self, sql: str, question: str) -> str:
-        from langchain_core.messages import SystemMessage, HumanMessage
-        
-        messages = [
-            SystemMessage(content="You are a helpful data analyst. Explain the SQL query in simple terms."),
-            HumanMessage(content=f"Question: {question}\nSQL: {sql}\n\nExplain:")
-        ]
-        response = self.llm.invoke(messages)
+        response = self.llm.invoke(self._explain_messages(sql, question))
+        return response.content.strip()
+
+    async def agenerate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        response = await self.llm.ainvoke(self._sql_messages(prompt, history))
+        return response.content.strip()
+
+    async def aexplain_sql(self, sql: str, question: str) -> str:
+        response = await self.llm.ainvoke(self._explain_messages(sql, question))
         return response.content.strip()
 
 
@@ -146,13 +194,18 @@ class OllamaLLMClient(LLMClient):
     """Client for Ollama (local LLM)."""
     
     def __init__(self, model: str = "llama3"):
+        import requests
+        from requests.adapters import HTTPAdapter
+        
         self.model = model
         self.base_url = "http://localhost:11434/api/generate"
+        # Keep-alive connections reused across calls. The pool holds as many
+        # sockets as there can be concurrent LLM calls; requests' default of
+        # 10 would close and reopen the surplus under load.
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_maxsize=settings.LLM_MAX_CONCURRENCY))
 
     def generate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
-        import requests
-        import json
-        
         system_prompt = "You are an expert SQL assistant. Return ONLY the SQL query, nothing else. Do not use markdown formatting."
         
         context_str = ""
@@ -163,7 +216,7 @@ class OllamaLLMClient(LLMClient):
         full_prompt = f"{system_prompt}\n\n{context_str}\nuser: {prompt}"
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.base_url,
                 json={"model": self.model, "prompt": full_prompt, "stream": False},
                 timeout=30
@@ -174,12 +227,10 @@ class OllamaLLMClient(LLMClient):
             return f"-- Error generating SQL with Ollama: {str(e)}"
 
     def explain_sql(self, sql: str, question: str) -> str:
-        import requests
-        
         prompt = f"Explain this SQL query for the question '{question}': {sql}"
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.base_url,
                 json={"model": self.model, "prompt": prompt, "stream": False},
                 timeout=30
@@ -205,14 +256,14 @@ class VLLMClient(LLMClient):
             temperature=settings.LLM_TEMPERATURE,
             max_tokens=settings.LLM_MAX_TOKENS,
         )
-        self._SystemMessage = SystemMessage
         self._HumanMessage = HumanMessage
         self._AIMessage = AIMessage
+        # System messages are identical on every call, so build them once
+        self._sql_system = SystemMessage(content="You are an expert SQL assistant. Return ONLY the SQL query, nothing else. Do not use markdown formatting.")
+        self._explain_system = SystemMessage(content="You are a helpful data analyst. Explain the SQL query in simple terms.")
 
-    def generate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
-        messages = [
-            self._SystemMessage(content="You are an expert SQL assistant. Return ONLY the SQL query, nothing else. Do not use markdown formatting.")
-        ]
+    def _sql_messages(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> list:
+        messages = [self._sql_system]
         
         if history:
             for msg in history:
@@ -222,16 +273,28 @@ class VLLMClient(LLMClient):
                     messages.append(self._AIMessage(content=msg['content']))
         
         messages.append(self._HumanMessage(content=prompt))
-        
-        response = self.llm.invoke(messages)
-        return response.content.strip()
+        return messages
 
-    def explain_sql(self, sql: str, question: str) -> str:
-        messages = [
-            self._SystemMessage(content="You are a helpful data analyst. Explain the SQL query in simple terms."),
+    def _explain_messages(self, sql: str, question: str) -> list:
+        return [
+            self._explain_system,
             self._HumanMessage(content=f"Question: {question}\nSQL: {sql}\n\nExplain this query:")
         ]
-        response = self.llm.invoke(messages)
+
+    def generate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        response = self.llm.invoke(self._sql_messages(prompt, history))
+        return response.content.strip()
+
+    def explain_sql(self, sql: str, question: str) -> str:
+        response = self.llm.invoke(self._explain_messages(sql, question))
+        return response.content.strip()
+
+    async def agenerate_sql(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> str:
+        response = await self.llm.ainvoke(self._sql_messages(prompt, history))
+        return response.content.strip()
+
+    async def aexplain_sql(self, sql: str, question: str) -> str:
+        response = await self.llm.ainvoke(self._explain_messages(sql, question))
         return response.content.strip()
 
 
@@ -257,6 +320,13 @@ class LLMClientFactory:
         else:
             return MockLLMClient()
 
+@lru_cache(maxsize=1)
 def get_llm_client() -> LLMClient:
-    """Legacy factory function wrapper."""
+    """
+    Legacy factory function wrapper.
+    
+    The client is built once per process so provider SDK clients (and their
+    HTTP connection pools) are reused across requests. Call
+    ``get_llm_client.cache_clear()`` after changing the provider settings.
+    """
     return LLMClientFactory.create(settings.LLM_PROVIDER)
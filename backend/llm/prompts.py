@@ -1,19 +1,16 @@
 ﻿from backend.database.schema import sales_table
 from sqlalchemy.schema import CreateTable
-from sqlalchemy.engine import mock
+from sqlalchemy.dialects import sqlite
+
+# The sales table is static, so its DDL is compiled once at import
+_SALES_DDL = str(CreateTable(sales_table).compile(dialect=sqlite.dialect()))
 
 def get_schema_string():
     """
     Returns the DDL (CREATE TABLE statement) for the sales table
     to be included in the prompt.
     """
-    # Use a mock engine to generate DDL without connecting to a DB
-    def dump(sql, *multiparams, **params):
-        return sql.compile(dialect=mock.engine.dialect)
-    
-    engine = mock.create_mock_engine("sqlite://", dump)
-    ddl = CreateTable(sales_table).compile(engine)
-    return str(ddl)
+    return _SALES_DDL
 
 TEXT_TO_SQL_PROMPT_TEMPLATE = """
 You are an expert SQL data analyst. Your task is to translate a natural language question into a valid SQLite SQL query.
@@ -42,6 +39,11 @@ Question: {question}
 SQL:
 """
 
+# Everything but the question is fixed, so the template is rendered once and
+# split around the question slot; per request it is two concatenations
+_TEXT_TO_SQL_HEAD, _, _TEXT_TO_SQL_TAIL = TEXT_TO_SQL_PROMPT_TEMPLATE.format(
+    schema=_SALES_DDL, question="{question}"
+).partition("{question}")
+
 def get_text_to_sql_prompt(question: str) -> str:
-    schema_str = get_schema_string()
-    return TEXT_TO_SQL_PROMPT_TEMPLATE.format(schema=schema_str, question=question)
+    return _TEXT_TO_SQL_HEAD + question + _TEXT_TO_SQL_TAIL
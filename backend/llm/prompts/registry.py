@@ -3,22 +3,42 @@ Prompt Versioning System.
 
 Manages different versions of prompts to allow for A/B testing and rollback.
 """
-from typing import Dict, Optional
-from pydantic import BaseModel
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from pydantic import BaseModel, ConfigDict
+import threading
 import yaml
 import os
 
 class PromptVersion(BaseModel):
+    # Frozen so cached instances can be handed out without copying
+    model_config = ConfigDict(frozen=True)
+
     id: str
     version: str
     template: str
     description: str
     input_variables: list[str]
 
+# Built-in "text_to_sql" prompt used when no template file exists
+_DEFAULT_TEXT_TO_SQL = PromptVersion(
+    id="text_to_sql",
+    version="v1.0",
+    template="Given the following schema:\n{schema}\n\nWrite a SQL query to answer: {question}",
+    description="Standard text-to-sql prompt",
+    input_variables=["schema", "question"]
+)
+
 class PromptRegistry:
+    # Parsed template files kept in memory, least recently used evicted first
+    CACHE_MAX_ENTRIES = 100
+
     def __init__(self, prompts_dir: str = "backend/llm/prompts/templates"):
         self.prompts_dir = prompts_dir
         self._prompts: Dict[str, Dict[str, PromptVersion]] = {}
+        # (name, version) -> (mtime_ns, size, prompt); a changed file is re-parsed
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[int, int, PromptVersion]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         # Ensure directory exists
         os.makedirs(prompts_dir, exist_ok=True)
 
@@ -27,22 +47,36 @@ class PromptRegistry:
         # In a real system, this might load from a DB or file system
         # For now, we simulate with a default template if file not found
         
-        # Try to load from file
+        # Try to load from file; one stat both checks existence and
+        # validates the cached parse
         file_path = os.path.join(self.prompts_dir, f"{name}_{version}.yaml")
-        if os.path.exists(file_path):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            stat = None
+        
+        if stat is not None:
+            key = (name, version)
+            cached = self._cache.get(key)
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                with self._cache_lock:
+                    if key in self._cache:
+                        self._cache.move_to_end(key)
+                return cached[2]
+            
             with open(file_path, 'r') as f:
                 data = yaml.safe_load(f)
-                return PromptVersion(**data)
+            prompt = PromptVersion(**data)
+            with self._cache_lock:
+                self._cache[key] = (stat.st_mtime_ns, stat.st_size, prompt)
+                self._cache.move_to_end(key)
+                if len(self._cache) > self.CACHE_MAX_ENTRIES:
+                    self._cache.popitem(last=False)
+            return prompt
         
         # Fallback for "text_to_sql" default
         if name == "text_to_sql":
-            return PromptVersion(
-                id="text_to_sql",
-                version="v1.0",
-                template="Given the following schema:\n{schema}\n\nWrite a SQL query to answer: {question}",
-                description="Standard text-to-sql prompt",
-                input_variables=["schema", "question"]
-            )
+            return _DEFAULT_TEXT_TO_SQL
         return None
 
     def save_prompt(self, prompt: PromptVersion):
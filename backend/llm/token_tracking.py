@@ -6,9 +6,14 @@ Tracks token usage for LLM requests to monitor costs and usage patterns.
 from sqlalchemy.orm import Session
 from backend.database.models import Base
 from sqlalchemy import Column, Integer, String, DateTime, Float
-from datetime import datetime
 import uuid
 
+import structlog
+
+from backend.observability.metrics import llm_token_usage_for
+
+logger = structlog.get_logger(component="llm")
+
 # Define TokenUsage model (if not already in models.py, but better to keep separate or add here)
 # For simplicity, we will assume this model is used by the service directly or added to models.py
 # But since I cannot easily edit models.py without migration issues right now, 
@@ -30,9 +35,6 @@ class TokenUsageTracker:
         In a real production system, this would write to a 'token_usage' table.
         For now, we will log it using structlog which is already set up.
         """
-        import structlog
-        logger = structlog.get_logger()
-        
         logger.info(
             "token_usage",
             user_id=user_id,
@@ -41,13 +43,11 @@ class TokenUsageTracker:
             prompt_tokens=prompt_tokens,
             completion_tokens=completion_tokens,
             total_tokens=prompt_tokens + completion_tokens,
-            estimated_cost=cost,
-            timestamp=datetime.utcnow().isoformat()
+            estimated_cost=cost
         )
 
         # Update Prometheus metrics
-        from backend.observability.metrics import LLM_TOKEN_USAGE
-        LLM_TOKEN_USAGE.labels(provider=provider, model=model, type="prompt").inc(prompt_tokens)
-        LLM_TOKEN_USAGE.labels(provider=provider, model=model, type="completion").inc(completion_tokens)
+        llm_token_usage_for(provider, model, "prompt").inc(prompt_tokens)
+        llm_token_usage_for(provider, model, "completion").inc(completion_tokens)
 
 token_tracker = TokenUsageTracker()
@@ -0,0 +1,133 @@
+"""
+Background Audit Log Writer.
+
+Moves AuditLog inserts off the request path: handlers enqueue plain dicts
+and a background task writes them in batches with a single commit.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+import structlog
+
+from backend.config.settings import settings
+from backend.database.connection import SessionLocal
+from backend.database.models import AuditLog
+from backend.database.repository import BaseRepository
+
+logger = structlog.get_logger(component="audit")
+
+# Queue sentinel telling the writer task to flush and exit
+_STOP = None
+
+
+class AuditLogWriter:
+    """
+    Batches audit log entries and writes them from a background task.
+
+    A batch is written when it reaches ``batch_size`` entries or when
+    ``flush_interval`` seconds have passed since its first entry, whichever
+    comes first. While the writer is not running (scripts, tests without
+    startup events), entries are written synchronously; when its queue is
+    full they are written from a worker thread. No audit record is dropped.
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 0.5, maxsize: int = 10_000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.maxsize = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._overflow: Set[asyncio.Future] = set()
+
+    @property
+    def running(self) -> bool:
+        """Whether the background task is accepting entries."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background writer on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush pending entries and stop the background writer."""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        if self._overflow:
+            await asyncio.gather(*self._overflow)
+        self._task = None
+        self._queue = None
+
+    def submit(self, **fields: Any) -> None:
+        """
+        Queue an audit log entry.
+
+        Args:
+            **fields: AuditLog column values
+        """
+        fields.setdefault("timestamp", datetime.utcnow())
+
+        if self.running:
+            try:
+                self._queue.put_nowait(fields)
+                return
+            except asyncio.QueueFull:
+                logger.warning("audit_queue_full", maxsize=self.maxsize)
+
+            # Keep the blocking insert off the already overloaded event loop
+            future = asyncio.get_running_loop().run_in_executor(None, self._write_batch, [fields])
+            self._overflow.add(future)
+            future.add_done_callback(self._overflow.discard)
+            return
+
+        self._write_batch([fields])
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is _STOP:
+                break
+
+            batch = [entry]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            await asyncio.to_thread(self._write_batch, batch)
+
+    @staticmethod
+    def _write_batch(batch: List[Dict[str, Any]]) -> None:
+        db = SessionLocal()
+        try:
+            BaseRepository(AuditLog, db).bulk_create(batch)
+        except Exception as e:
+            db.rollback()
+            logger.error("audit_log_write_failed", entries=len(batch), error=str(e))
+        finally:
+            db.close()
+
+
+# Global writer instance
+audit_writer = AuditLogWriter(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    maxsize=settings.AUDIT_QUEUE_MAXSIZE,
+)
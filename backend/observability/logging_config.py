@@ -3,49 +3,113 @@ Structured logging configuration using structlog.
 
 Provides JSON-formatted logs for production observability.
 """
+import atexit
 import logging
 import sys
+import threading
+import orjson
 import structlog
 from backend.config.settings import settings
 
 
+def get_log_level() -> int:
+    """Numeric log level configured via ``LOG_LEVEL`` (defaults to INFO)."""
+    return getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+
+
+class BufferedLineWriter:
+    """
+    Binary file wrapper that batches whole log lines into large writes.
+
+    structlog's BytesLogger flushes after every line, which is one write
+    syscall per log event. Lines are collected here instead and written
+    once ``buffer_size`` bytes have accumulated, always on a line boundary
+    so output from other writers to the same stream never splits a line.
+    Pending lines are written at interpreter exit; until then, on a quiet
+    process, the most recent lines may sit in the buffer.
+    """
+
+    def __init__(self, file, buffer_size: int):
+        self._file = file
+        self._buffer_size = buffer_size
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes) -> None:
+        with self._lock:
+            self._buffer += data
+            if len(self._buffer) >= self._buffer_size:
+                self._drain()
+
+    def flush(self) -> None:
+        # Called by BytesLogger after every line; writes happen in write()
+        pass
+
+    def close(self) -> None:
+        """Write any pending lines."""
+        with self._lock:
+            self._drain()
+
+    def _drain(self) -> None:
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._buffer.clear()
+
+
 def configure_logging():
     """
     Configure structured logging for the application.
     
-    In development: pretty console output
-    In production: JSON logs for log aggregation
+    In development: pretty console output through stdlib logging
+    In production: orjson-rendered JSON written straight to stdout as bytes,
+    bypassing the stdlib logging formatter for application logs
     """
     # Determine log level
-    log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+    log_level = get_log_level()
     
-    # Configure standard logging
+    # Configure standard logging (third-party libraries, development output)
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
         level=log_level
     )
     
-    # Configure structlog
-    processors = [
-        structlog.contextvars.merge_contextvars,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-    ]
-    
     if settings.is_production:
+        log_file = sys.stdout.buffer
+        if settings.LOG_BUFFER_BYTES > 0:
+            log_file = BufferedLineWriter(log_file, settings.LOG_BUFFER_BYTES)
+            atexit.register(log_file.close)
+        
         # JSON logs for production
-        processors.append(structlog.processors.JSONRenderer())
-    else:
-        # Pretty console logs for development
-        processors.append(structlog.dev.ConsoleRenderer())
+        structlog.configure(
+            processors=[
+                structlog.contextvars.merge_contextvars,
+                structlog.processors.add_log_level,
+                structlog.processors.TimeStamper(fmt="iso", utc=True),
+                structlog.processors.StackInfoRenderer(),
+                structlog.processors.format_exc_info,
+                structlog.processors.JSONRenderer(serializer=orjson.dumps),
+            ],
+            wrapper_class=structlog.make_filtering_bound_logger(log_level),
+            context_class=dict,
+            logger_factory=structlog.BytesLoggerFactory(file=log_file),
+            cache_logger_on_first_use=True,
+        )
+        return
     
+    # Pretty console logs for development
     structlog.configure(
-        processors=processors,
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.dev.ConsoleRenderer(),
+        ],
         wrapper_class=structlog.stdlib.BoundLogger,
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -3,6 +3,7 @@ Prometheus Metrics Exporter.
 
 Defines and exposes application metrics for monitoring.
 """
+from functools import lru_cache
 from prometheus_client import Counter, Histogram, Gauge
 import time
 
@@ -50,6 +51,38 @@ SQL_EXECUTION_TIME = Histogram(
     "SQL query execution time"
 )
 
+# Label children are resolved once per (method, route template, status);
+# endpoints are route templates, so the label space stays bounded.
+@lru_cache(maxsize=1024)
+def request_count_for(method: str, endpoint: str, status: int):
+    """Cached REQUEST_COUNT child for a label combination."""
+    return REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=status)
+
+
+@lru_cache(maxsize=1024)
+def request_latency_for(method: str, endpoint: str):
+    """Cached REQUEST_LATENCY child for a label combination."""
+    return REQUEST_LATENCY.labels(method=method, endpoint=endpoint)
+
+
+@lru_cache(maxsize=256)
+def llm_request_count_for(provider: str, model: str):
+    """Cached LLM_REQUEST_COUNT child for a label combination."""
+    return LLM_REQUEST_COUNT.labels(provider=provider, model=model)
+
+
+@lru_cache(maxsize=256)
+def llm_latency_for(provider: str, model: str):
+    """Cached LLM_LATENCY child for a label combination."""
+    return LLM_LATENCY.labels(provider=provider, model=model)
+
+
+@lru_cache(maxsize=256)
+def llm_token_usage_for(provider: str, model: str, type: str):
+    """Cached LLM_TOKEN_USAGE child for a label combination."""
+    return LLM_TOKEN_USAGE.labels(provider=provider, model=model, type=type)
+
+
 def track_time(histogram: Histogram, labels: dict = None):
     """Decorator to track execution time."""
     def decorator(func):
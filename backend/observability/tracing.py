@@ -3,13 +3,34 @@ Request Tracing Module.
 
 Provides utilities for tracing requests across the system.
 """
-import uuid
+import itertools
+import os
 from contextvars import ContextVar
 from typing import Optional
 
 # Context variable to store request ID
 request_id_ctx: ContextVar[str] = ContextVar("request_id", default="unknown")
 
+# Request IDs are a random per-process prefix plus a counter, so minting
+# one needs no entropy syscall. The prefix is re-drawn in forked workers
+# so processes started from a preloaded app never share it.
+_process_prefix = os.urandom(6).hex()
+_request_counter = itertools.count()
+
+
+def _reseed_request_ids() -> None:
+    global _process_prefix, _request_counter
+    _process_prefix = os.urandom(6).hex()
+    _request_counter = itertools.count()
+
+
+os.register_at_fork(after_in_child=_reseed_request_ids)
+
+
+def new_request_id() -> str:
+    """Return a request ID unique across processes (e.g. ``3f9c0a1b2d4e-1a``)."""
+    return f"{_process_prefix}-{next(_request_counter):x}"
+
 def get_request_id() -> str:
     """Get the current request ID."""
     return request_id_ctx.get()
@@ -17,6 +38,6 @@ def get_request_id() -> str:
 def set_request_id(request_id: Optional[str] = None) -> str:
     """Set a new request ID."""
     if not request_id:
-        request_id = str(uuid.uuid4())
+        request_id = new_request_id()
     request_id_ctx.set(request_id)
     return request_id
@@ -10,4 +10,5 @@ Features:
 - Destructive operation blocking
 - Table-level access control
 - Validation explanations
+- Pre-LLM question filtering and templates
 """
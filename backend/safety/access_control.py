@@ -4,27 +4,33 @@ Access Control Module for Table and Column Level Permissions.
 This module implements fine-grained access control logic, allowing the system
 to restrict access not just to tables, but to specific columns based on user roles.
 """
-from typing import Dict, List, Set, Optional
+from typing import Dict, FrozenSet, List
 from backend.auth.models import RoleEnum, PermissionType
 
+# Column names below are lowercase; requested columns are lowercased once
+# and matched against these prebuilt sets.
+
 # Define sensitive columns that require higher privileges
-SENSITIVE_COLUMNS = {
-    "users": {"hashed_password", "email", "is_superuser"},
-    "salaries": {"amount", "bonus"},  # Hypothetical table
-    "customers": {"credit_limit", "phone"}
+SENSITIVE_COLUMNS: Dict[str, FrozenSet[str]] = {
+    "users": frozenset({"hashed_password", "email", "is_superuser"}),
+    "salaries": frozenset({"amount", "bonus"}),  # Hypothetical table
+    "customers": frozenset({"credit_limit", "phone"})
 }
 
+_ALL_COLUMNS: FrozenSet[str] = frozenset({"*"})
+_NO_COLUMNS: FrozenSet[str] = frozenset()
+
 # Define column-level restrictions per role
 # If a role is not listed, they have access to all non-sensitive columns
 # If a table is not listed, standard table-level RBAC applies
-COLUMN_ACCESS_POLICIES = {
+COLUMN_ACCESS_POLICIES: Dict[RoleEnum, Dict[str, FrozenSet[str]]] = {
     RoleEnum.VIEWER: {
-        "customers": {"customername", "city", "country"},  # Whitelist: only these columns
-        "sales": {"*"}  # Access to all columns in sales
+        "customers": frozenset({"customername", "city", "country"}),  # Whitelist: only these columns
+        "sales": _ALL_COLUMNS  # Access to all columns in sales
     },
     RoleEnum.ANALYST: {
-        "customers": {"*"}, # Access to all columns
-        "sales": {"*"}
+        "customers": _ALL_COLUMNS, # Access to all columns
+        "sales": _ALL_COLUMNS
     }
 }
 
@@ -32,23 +38,17 @@ class AccessControlService:
     """Service to enforce fine-grained access control policies."""
 
     @staticmethod
-    def get_allowed_columns(role: RoleEnum, table: str) -> Set[str]:
+    def get_allowed_columns(role: RoleEnum, table: str) -> FrozenSet[str]:
         """
-        Get the set of allowed columns for a given role and table.
+        Get the set of allowed (lowercase) columns for a given role and table.
         Returns {'*'} if all columns are allowed.
         """
         # Admin has access to everything
         if role == RoleEnum.ADMIN:
-            return {"*"}
+            return _ALL_COLUMNS
 
-        # Check specific policies
-        if role in COLUMN_ACCESS_POLICIES:
-            role_policy = COLUMN_ACCESS_POLICIES[role]
-            if table in role_policy:
-                return role_policy[table]
-        
         # Default: If no specific column policy, allow all (subject to sensitive filter)
-        return {"*"}
+        return COLUMN_ACCESS_POLICIES.get(role, {}).get(table, _ALL_COLUMNS)
 
     @staticmethod
     def is_column_access_allowed(role: RoleEnum, table: str, column: str) -> bool:
@@ -56,24 +56,31 @@ class AccessControlService:
         if role == RoleEnum.ADMIN:
             return True
 
-        # Check sensitive columns first
-        if table in SENSITIVE_COLUMNS and column in SENSITIVE_COLUMNS[table]:
-            # Only ADMIN (already handled) or specific roles might access sensitive data
-            # For now, block everyone else
-            return False
-
-        allowed = AccessControlService.get_allowed_columns(role, table)
-        if "*" in allowed:
-            return True
-        
-        return column.lower() in {c.lower() for c in allowed}
+        return AccessControlService._column_allowed(
+            column.lower(),
+            SENSITIVE_COLUMNS.get(table, _NO_COLUMNS),
+            AccessControlService.get_allowed_columns(role, table),
+        )
 
     @staticmethod
     def filter_query_columns(role: RoleEnum, table: str, requested_columns: List[str]) -> List[str]:
         """
         Filter a list of requested columns, returning only those allowed.
         """
+        if role == RoleEnum.ADMIN:
+            return list(requested_columns)
+
+        # Policy lookups happen once per call, not once per column
+        sensitive = SENSITIVE_COLUMNS.get(table, _NO_COLUMNS)
+        allowed = AccessControlService.get_allowed_columns(role, table)
         return [
-            col for col in requested_columns 
-            if AccessControlService.is_column_access_allowed(role, table, col)
+            col for col in requested_columns
+            if AccessControlService._column_allowed(col.lower(), sensitive, allowed)
         ]
+
+    @staticmethod
+    def _column_allowed(column: str, sensitive: FrozenSet[str], allowed: FrozenSet[str]) -> bool:
+        # Sensitive columns are blocked for everyone but ADMIN (handled by callers)
+        if column in sensitive:
+            return False
+        return "*" in allowed or column in allowed
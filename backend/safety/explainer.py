@@ -7,6 +7,44 @@ or blocked by the safety engine. It helps build trust and understanding.
 from typing import List, Optional
 from backend.safety.policies import SQLPolicy
 
+def _explain_forbidden_command(policy: SQLPolicy) -> str:
+    return (
+        f"The query attempted to use a command that is not allowed in "
+        f"'{policy.mode.value}' mode. Only {', '.join(policy.allowed_commands)} "
+        f"operations are permitted to ensure data safety."
+    )
+
+
+def _explain_table_access(policy: SQLPolicy) -> str:
+    return (
+        "You do not have permission to access one or more tables referenced "
+        "in this query. Please check your user role and permissions."
+    )
+
+
+def _explain_multiple_statements(policy: SQLPolicy) -> str:
+    return (
+        "For security reasons, executing multiple SQL statements in a single "
+        "request is blocked to prevent SQL injection attacks."
+    )
+
+
+def _explain_row_limit(policy: SQLPolicy) -> str:
+    return (
+        f"The query would return too many rows. The current safety policy "
+        f"limits results to {policy.max_rows} rows to prevent system overload."
+    )
+
+
+# Lowercase substring of a rejection reason -> explanation, first match wins
+_REJECTION_EXPLANATIONS = (
+    ("forbidden command", _explain_forbidden_command),
+    ("table access denied", _explain_table_access),
+    ("multiple statements", _explain_multiple_statements),
+    ("row limit", _explain_row_limit),
+)
+
+
 class SafetyExplainer:
     """Generates explanations for safety validation results."""
 
@@ -15,30 +53,10 @@ class SafetyExplainer:
         """
         Generate a user-friendly explanation for a rejection.
         """
-        if "forbidden command" in reason.lower():
-            return (
-                f"The query attempted to use a command that is not allowed in "
-                f"'{policy.mode.value}' mode. Only {', '.join(policy.allowed_commands)} "
-                f"operations are permitted to ensure data safety."
-            )
-        
-        if "table access denied" in reason.lower():
-            return (
-                "You do not have permission to access one or more tables referenced "
-                "in this query. Please check your user role and permissions."
-            )
-
-        if "multiple statements" in reason.lower():
-            return (
-                "For security reasons, executing multiple SQL statements in a single "
-                "request is blocked to prevent SQL injection attacks."
-            )
-            
-        if "row limit" in reason.lower():
-            return (
-                f"The query would return too many rows. The current safety policy "
-                f"limits results to {policy.max_rows} rows to prevent system overload."
-            )
+        reason_lower = reason.lower()
+        for needle, explain in _REJECTION_EXPLANATIONS:
+            if needle in reason_lower:
+                return explain(policy)
 
         return f"The query was blocked by the safety engine: {reason}"
 
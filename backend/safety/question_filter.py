@@ -0,0 +1,95 @@
+"""
+Pre-LLM Question Filter.
+
+Cheap checks on the natural language question that run before any LLM call:
+- Rule-based rejection of destructive or prompt-injection requests
+- Template matching for common questions with a known SQL answer
+
+Both use patterns compiled once at import, so a request that is rejected or
+answered here costs microseconds instead of an LLM round trip. Template SQL
+still goes through the regular SQL validation.
+"""
+import re
+from typing import Dict, Optional, Tuple
+
+from backend.config.settings import settings
+from backend.safety.policies import SafetyMode
+
+# Questions asking the system to change data or schema
+_DESTRUCTIVE_RE = re.compile(
+    r"\b(drop|truncate|alter)\s+(the\s+)?(tables?|database|schema|columns?)\b"
+    r"|\bdelete\s+(from|all|(the\s+)?(rows?|records?|data|users?))\b"
+    r"|\binsert\s+(into|(new\s+)?(rows?|records?|data))\b"
+    r"|\bupdate\s+(all\s+|the\s+)?(tables?|rows?|records?|data|users?)\b"
+    r"|\b(grant|revoke)\s+(all|admin|select|insert|update|delete)\b",
+    re.IGNORECASE,
+)
+
+# Attempts to override the system prompt
+_INJECTION_RE = re.compile(
+    r"\b(ignore|disregard|forget)\b.{0,20}\b(previous|prior|above|all|system)\b.{0,20}\b(instructions?|prompts?|rules?)\b",
+    re.IGNORECASE,
+)
+
+# Question templates with a fixed SQL answer. Patterns match the normalized
+# question (lowercase, single spaces, no trailing punctuation).
+QUESTION_TEMPLATES: Dict[str, Tuple[str, str]] = {
+    "total_revenue": (
+        r"(what is|what's|show|show me|get)?\s*(the\s+)?total\s+(revenue|sales)",
+        "SELECT SUM(SALES) FROM sales;",
+    ),
+    "order_count": (
+        r"how many orders( are there| were placed)?( in total)?",
+        "SELECT COUNT(DISTINCT ORDERNUMBER) FROM sales;",
+    ),
+    "order_count_by_year": (
+        r"how many orders( were placed)? in (?P<year>(19|20)\d{2})",
+        "SELECT COUNT(DISTINCT ORDERNUMBER) FROM sales WHERE YEAR_ID = {year};",
+    ),
+}
+
+_TEMPLATE_PATTERNS = {name: re.compile(pattern) for name, (pattern, _) in QUESTION_TEMPLATES.items()}
+
+# All templates in one alternation so a miss is a single regex pass. Inner
+# named groups are made anonymous (names must be unique across the
+# alternation); parameters are read from the winning template's own pattern.
+_GROUP_NAME_RE = re.compile(r"\(\?P<\w+>")
+_ANY_TEMPLATE_RE = re.compile("|".join(
+    f"(?P<{name}>{_GROUP_NAME_RE.sub('(?:', pattern)})"
+    for name, (pattern, _) in QUESTION_TEMPLATES.items()
+))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize(question: str) -> str:
+    return _WHITESPACE_RE.sub(" ", question.strip().lower()).rstrip("?.! ")
+
+
+def reject_question(question: str) -> Optional[str]:
+    """
+    Return the reason a question is rejected before generation, or None.
+
+    Write-intent questions are only rejected when the safety mode forbids
+    writes; prompt-injection attempts are always rejected.
+    """
+    if _INJECTION_RE.search(question):
+        return "Question attempts to override system instructions."
+    if settings.SAFETY_MODE != SafetyMode.PERMISSIVE.value and _DESTRUCTIVE_RE.search(question):
+        return "Question requests a data-modifying operation, which is not allowed."
+    return None
+
+
+def match_template(question: str) -> Optional[str]:
+    """Return the SQL for a question matching a known template, or None."""
+    if not settings.ENABLE_QUERY_TEMPLATES:
+        return None
+
+    normalized = _normalize(question)
+    match = _ANY_TEMPLATE_RE.fullmatch(normalized)
+    if match is None:
+        return None
+
+    name = match.lastgroup
+    params = _TEMPLATE_PATTERNS[name].fullmatch(normalized).groupdict()
+    return QUESTION_TEMPLATES[name][1].format(**params)
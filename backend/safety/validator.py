@@ -1,4 +1,7 @@
-﻿import sqlparse
+﻿from functools import lru_cache
+from typing import FrozenSet, NamedTuple, Optional
+
+import sqlparse
 from sqlparse.sql import Statement, Token
 from sqlparse.tokens import Keyword
 
@@ -10,6 +13,14 @@ from backend.safety.access_control import AccessControlService
 from backend.safety.explainer import SafetyExplainer
 from backend.api.schemas.query import SQLValidationResult
 
+class SQLAnalysis(NamedTuple):
+    """User-independent facts parsed from a SQL string."""
+    error: Optional[str]
+    command_type: str = ""
+    tables: FrozenSet[str] = frozenset()
+    select_star: bool = False
+
+
 class SQLValidator:
     """
     Advanced SQL Validator using sqlparse and policy-based rules.
@@ -52,28 +63,19 @@ class SQLValidator:
         if not sql or not sql.strip():
             return False, "Empty SQL query."
 
-        # Parse SQL
-        try:
-            parsed = sqlparse.parse(sql)
-        except Exception as e:
-            return False, f"SQL parsing error: {str(e)}"
-
-        # 1. Check for multiple statements
-        if len(parsed) > 1:
-            # Some parsers might split semicolon ending as a second empty statement
-            # Check if the second statement is meaningful
-            if any(token.ttype is not sqlparse.tokens.Whitespace for token in parsed[1].flatten()):
-                 return False, "Multiple SQL statements are not allowed (semicolon injection prevention)."
-
-        stmt = parsed[0]
+        # Parsing dominates validation cost and doesn't depend on the user,
+        # so it is shared across requests for the same SQL
+        analysis = self.analyze(sql)
+        if analysis.error:
+            return False, analysis.error
         
         # 2. Check Command Type (DML/DDL)
-        command_type = stmt.get_type().upper()
+        command_type = analysis.command_type
         if command_type not in self.policy.allowed_commands:
             return False, f"Forbidden command '{command_type}'. Allowed: {self.policy.allowed_commands}"
 
         # 3. Extract Tables and Check Permissions
-        tables = self._extract_tables(stmt)
+        tables = analysis.tables
         if not tables and command_type == "SELECT":
              # Simple SELECT 1 or SELECT version() might have no tables, which is usually fine
              pass
@@ -92,18 +94,47 @@ class SQLValidator:
             if "*" in allowed_columns:
                 continue
                 
-            if self._is_select_star(stmt):
+            if analysis.select_star:
                  return False, f"SELECT * is not allowed for table '{table}' due to column restrictions. Please select specific columns."
 
         return True, ""
 
-    def _is_select_star(self, stmt: Statement) -> bool:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def analyze(sql: str) -> SQLAnalysis:
+        """
+        Parse SQL into the facts validation needs (memoized per SQL string).
+        """
+        # Parse SQL
+        try:
+            parsed = sqlparse.parse(sql)
+        except Exception as e:
+            return SQLAnalysis(error=f"SQL parsing error: {str(e)}")
+
+        # 1. Check for multiple statements
+        if len(parsed) > 1:
+            # Some parsers might split semicolon ending as a second empty statement
+            # Check if the second statement is meaningful
+            if any(token.ttype is not sqlparse.tokens.Whitespace for token in parsed[1].flatten()):
+                 return SQLAnalysis(error="Multiple SQL statements are not allowed (semicolon injection prevention).")
+
+        stmt = parsed[0]
+        return SQLAnalysis(
+            error=None,
+            command_type=stmt.get_type().upper(),
+            tables=frozenset(SQLValidator._extract_tables(stmt)),
+            select_star=SQLValidator._is_select_star(stmt)
+        )
+
+    @staticmethod
+    def _is_select_star(stmt: Statement) -> bool:
         for token in stmt.tokens:
             if token.ttype is sqlparse.tokens.Wildcard:
                 return True
         return False
 
-    def _extract_tables(self, stmt: Statement) -> set[str]:
+    @staticmethod
+    def _extract_tables(stmt: Statement) -> set[str]:
         """
         Extract table names from a parsed SQL statement.
         """
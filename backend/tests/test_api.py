@@ -1,5 +1,6 @@
 ﻿import pytest
 import sys
+import uuid
 from pathlib import Path
 from fastapi.testclient import TestClient
 
@@ -7,33 +8,55 @@ from fastapi.testclient import TestClient
 project_root = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(project_root))
 
-from backend.api.app import app
+from backend.api.main import app
+from backend.auth.models import RoleEnum
+from backend.auth.service import AuthService
+from backend.database.connection import SessionLocal
 
-client = TestClient(app)
+API_PREFIX = "/api/v1"
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Test client with startup events run (tables, default roles)."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="module")
+def auth_headers(client):
+    """Bearer token for a freshly created analyst."""
+    username = f"api_{uuid.uuid4().hex[:12]}"
+    db = SessionLocal()
+    try:
+        AuthService.create_user(db, f"{username}@example.com", username, "Passw0rd!x", roles=[RoleEnum.ANALYST])
+    finally:
+        db.close()
+    response = client.post(f"{API_PREFIX}/auth/login", data={"username": username, "password": "Passw0rd!x"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
 
 
 class TestAPI:
     """Test suite for API endpoints."""
 
-    def test_health_check(self):
+    def test_health_check(self, client):
         """Test the /health endpoint."""
-        response = client.get("/health")
+        response = client.get(f"{API_PREFIX}/health")
         assert response.status_code == 200
         data = response.json()
-        assert data["status"] == "ok"
+        assert data["status"] == "healthy"
 
-    def test_schema_endpoint(self):
+    def test_schema_endpoint(self, client, auth_headers):
         """Test the /schema endpoint."""
-        response = client.get("/schema")
+        response = client.get(f"{API_PREFIX}/schema/", headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
-        assert "schema_ddl" in data
-        assert "sales" in data["schema_ddl"].lower()
+        assert "sales" in [table["name"] for table in data["tables"]]
 
-    def test_query_endpoint_with_mock(self):
+    def test_query_endpoint_with_mock(self, client, auth_headers):
         """Test the /query endpoint with mock LLM."""
         payload = {"question": "What is the total revenue?"}
-        response = client.post("/query", json=payload)
+        response = client.post(f"{API_PREFIX}/query/", json=payload, headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
         assert "question" in data
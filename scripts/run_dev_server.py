@@ -32,5 +32,7 @@ if __name__ == "__main__":
         host=settings.API_HOST,
         port=settings.API_PORT,
         reload=settings.DEBUG,
+        loop="uvloop",
+        http="httptools",
         log_level=settings.LOG_LEVEL.lower()
     )
@@ -0,0 +1,31 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.api.main import app
+from backend.auth.models import RoleEnum
+from backend.auth.service import AuthService
+from backend.database.connection import SessionLocal
+
+PASSWORD = "Passw0rd!x"
+
+@pytest.fixture
+def live_client():
+    # Runs startup/shutdown, so tables, default roles and the audit writer exist
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def login(live_client):
+    def _login(role=RoleEnum.ADMIN):
+        username = f"test_{uuid.uuid4().hex[:12]}"
+        db = SessionLocal()
+        try:
+            user = AuthService.create_user(db, f"{username}@example.com", username, PASSWORD, roles=[role])
+            user_id = user.id
+        finally:
+            db.close()
+        response = live_client.post("/api/v1/auth/login", data={"username": username, "password": PASSWORD})
+        assert response.status_code == 200
+        return user_id, {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return _login
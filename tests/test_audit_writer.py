@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+from backend.observability.audit_writer import AuditLogWriter
+
+def _writer(batches, **kwargs):
+    writer = AuditLogWriter(**kwargs)
+    writer._write_batch = lambda batch: batches.append([entry["n"] for entry in batch])
+    return writer
+
+def test_full_batches_written_and_rest_flushed_on_stop():
+    batches = []
+
+    async def run():
+        writer = _writer(batches, batch_size=2, flush_interval=60)
+        writer.start()
+        for n in range(5):
+            writer.submit(n=n)
+        # Full batches go out without waiting for the flush interval
+        for _ in range(100):
+            if len(batches) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert batches == [[0, 1], [2, 3]]
+        await writer.stop()
+
+    asyncio.run(run())
+    assert batches == [[0, 1], [2, 3], [4]]
+
+def test_overflow_written_off_loop_and_awaited_on_stop():
+    batches = []
+
+    async def run():
+        writer = AuditLogWriter(batch_size=10, flush_interval=60, maxsize=1)
+        writer._write_batch = lambda batch: batches.append((batch[0]["n"], threading.current_thread()))
+        writer.start()
+        writer.submit(n=0)
+        writer.submit(n=1)
+        await writer.stop()
+        assert not writer.running
+
+    asyncio.run(run())
+    assert sorted(n for n, _ in batches) == [0, 1]
+    assert all(thread is not threading.main_thread() for _, thread in batches)
+
+def test_entries_written_inline_when_not_running():
+    batches = []
+    _writer(batches).submit(n=0)
+    assert batches == [[0]]
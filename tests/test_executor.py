@@ -0,0 +1,19 @@
+import pytest
+from backend.database import executor
+from backend.database.executor import QueryExecutionError, execute_sql_query, execute_sql_query_columnar
+
+QUERY = "SELECT 1 AS id, 'a' AS name UNION ALL SELECT 2, NULL UNION ALL SELECT 3, 'c'"
+
+def test_columns_are_transposed_rows():
+    rows = execute_sql_query(QUERY)
+    columns = execute_sql_query_columnar(QUERY, batch_size=2)
+    assert columns == {key: [row[key] for row in rows] for key in rows[0]}
+    assert columns == {"id": [1, 2, 3], "name": ["a", None, "c"]}
+
+@pytest.mark.parametrize("execute", [execute_sql_query, execute_sql_query_columnar])
+def test_unexpected_errors_wrapped(execute, monkeypatch):
+    def fail(query):
+        raise TypeError("driver failure")
+    monkeypatch.setattr(executor, "_text", fail)
+    with pytest.raises(QueryExecutionError, match="Unexpected error: driver failure"):
+        execute(QUERY)
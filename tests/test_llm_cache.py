@@ -0,0 +1,54 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.config.settings import settings
+from backend.llm import cache as llm_cache_module
+from backend.llm.cache import SemanticLLMCache
+
+class _NoExactCache:
+    def get(self, prompt, model):
+        return None
+
+    def set(self, prompt, model, response, ttl):
+        pass
+
+@pytest.fixture
+def semantic_cache(monkeypatch):
+    monkeypatch.setattr(settings, "ENABLE_SEMANTIC_CACHE", True)
+    # Every prompt embeds to the same vector, so any prompt is a perfect match
+    monkeypatch.setattr(llm_cache_module, "_embed", lambda text: np.full(4, 0.5, dtype=np.float32))
+    return SemanticLLMCache(_NoExactCache())
+
+def test_semantic_entries_expire(semantic_cache, monkeypatch):
+    semantic_cache.set("total revenue", "mock", "SELECT SUM(SALES) FROM sales;", ttl=60)
+    assert semantic_cache.get("total revenue", "mock") == "SELECT SUM(SALES) FROM sales;"
+    assert semantic_cache.get("revenue in total", "mock") == "SELECT SUM(SALES) FROM sales;"
+
+    now = time.monotonic()
+    monkeypatch.setattr(llm_cache_module, "time", SimpleNamespace(monotonic=lambda: now + 61))
+    assert semantic_cache.get("total revenue", "mock") is None
+
+    # Expired entries are evicted when the index is next written
+    semantic_cache.set("order count", "mock", "SELECT COUNT(*) FROM sales;", ttl=60)
+    assert semantic_cache.get("total revenue", "mock") == "SELECT COUNT(*) FROM sales;"
+    assert semantic_cache._responses[(settings.PROMPT_VERSION, "mock")] == ["SELECT COUNT(*) FROM sales;"]
+
+def test_semantic_entries_scoped_to_prompt_version(semantic_cache, monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_VERSION", "1")
+    semantic_cache.set("total revenue", "mock", "SELECT SUM(SALES) FROM sales;")
+    monkeypatch.setattr(settings, "PROMPT_VERSION", "2")
+    assert semantic_cache.get("total revenue", "mock") is None
+
+    semantic_cache.set("order count", "mock", "SELECT COUNT(*) FROM sales;")
+    assert list(semantic_cache._vectors) == [("2", "mock")]
+
+def test_semantic_lookup_skippable(semantic_cache):
+    semantic_cache.set("total revenue", "mock", "SELECT SUM(SALES) FROM sales;")
+    assert semantic_cache.get("total revenue", "mock", semantic=False) is None
+
+    semantic_cache.set("and by region?", "mock", "SELECT ...", semantic=False)
+    assert semantic_cache.get("revenue", "mock") == "SELECT SUM(SALES) FROM sales;"
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from backend.database.models import Base, QueryCache
+from backend.database.repository import UPSERT_INSERTS, BaseRepository, QueryCacheRepository
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+@pytest.mark.parametrize("upsert", [True, False])
+def test_record_cache_use_inserts_then_counts(db, upsert, monkeypatch):
+    if not upsert:
+        # Dialects without ON CONFLICT take the UPDATE-then-INSERT path
+        monkeypatch.delitem(UPSERT_INSERTS, "sqlite")
+    repo = QueryCacheRepository(db)
+    repo.record_cache_use("k1", generated_sql="SELECT 1", llm_provider="mock")
+    entry = db.query(QueryCache).filter_by(cache_key="k1").one()
+    assert (entry.generated_sql, entry.access_count) == ("SELECT 1", 0)
+    first_access = entry.accessed_at
+
+    repo.record_cache_use("k1", generated_sql="SELECT 2", llm_provider="mock")
+    repo.record_cache_use("k1", generated_sql="SELECT 2", llm_provider="mock")
+    db.expire_all()
+    entry = db.query(QueryCache).filter_by(cache_key="k1").one()
+    # Existing entries keep their values; only usage stats change
+    assert (entry.generated_sql, entry.access_count) == ("SELECT 1", 2)
+    assert entry.accessed_at >= first_access
+    assert db.query(QueryCache).count() == 1
+
+def test_bulk_create_returning_batches_inserts(db):
+    repo = BaseRepository(QueryCache, db)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    rows = [{"cache_key": f"k{i}", "generated_sql": "SELECT 1"} for i in range(5)] + [{"cache_key": "bare"}]
+    ids = repo.bulk_create_returning(rows)
+
+    # One INSERT per distinct key set, not one per row
+    inserts = [statement for statement in statements if statement.startswith("INSERT")]
+    assert len(inserts) == 2
+    assert sorted(repo.get(id).cache_key for id in ids) == sorted(row["cache_key"] for row in rows)
+    assert repo.bulk_create_returning([]) == []
+
+def test_bulk_update_and_delete_rowcount(db):
+    repo = BaseRepository(QueryCache, db)
+    ids = repo.bulk_create_returning([{"cache_key": "a"}, {"cache_key": "b"}])
+    repo.bulk_update([{"id": ids[0], "access_count": 5}, {"id": ids[1], "generated_sql": "SELECT 2"}])
+    db.expire_all()
+    assert (repo.get(ids[0]).access_count, repo.get(ids[1]).generated_sql) == (5, "SELECT 2")
+
+    assert repo.delete(ids[0]) == 1
+    assert repo.delete(ids[0]) == 0
+    assert [entry.id for entry in repo.get_all()] == [ids[1]]
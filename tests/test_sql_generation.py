@@ -1,5 +1,6 @@
 import pytest
 from backend.llm.client import MockLLMClient
+from backend.safety.question_filter import match_template
 
 def test_mock_generation():
     client = MockLLMClient()
@@ -11,3 +12,8 @@ def test_mock_explanation():
     client = MockLLMClient()
     explanation = client.explain_sql("SELECT * FROM users", "Show me all users")
     assert "Show me all users" in explanation
+
+def test_question_templates():
+    assert match_template("What is the total revenue?") == "SELECT SUM(SALES) FROM sales;"
+    assert "YEAR_ID = 2004" in match_template("How many orders were placed in 2004?")
+    assert match_template("Show me all users") is None